@@ -4,8 +4,11 @@ from greenmining.controllers.repository_controller import RepositoryController
 from greenmining.gsf_patterns import (
     GREEN_KEYWORDS,
     GSF_PATTERNS,
+    classify_messages,
     get_pattern_by_keywords,
     is_green_aware,
+    load_custom_patterns,
+    use_pattern_snapshots,
 )
 
 __version__ = "1.2.9"
@@ -43,6 +46,9 @@ def clone_repositories(
     github_token: str = None,
     output_dir: str = "./data",
     cleanup_existing: bool = False,
+    mirror_cache: bool = False,
+    cache_budget_mb: int = None,
+    features: list = None,
 ):
     # Clone repositories into ./greenmining_repos with sanitized directory names.
     # Args:
@@ -50,12 +56,19 @@ def clone_repositories(
     #   github_token: GitHub token (required for controller init)
     #   output_dir: Output directory for metadata files
     #   cleanup_existing: Remove existing greenmining_repos/ before cloning
+    #   mirror_cache: Clone/fetch bare mirrors in greenmining_repos/mirrors instead
+    #   cache_budget_mb: Mirror cache disk budget (LRU eviction, None = unlimited)
+    #   features: Feature tiers the clones are for; selects a partial clone filter
+    #             (blob:none, or tree:0 for messages only) and skips the checkout
     token = github_token or "unused"
     controller = RepositoryController(token, output_dir=output_dir)
 
     return controller.clone_repositories(
         repositories=repositories,
         cleanup_existing=cleanup_existing,
+        mirror_cache=mirror_cache,
+        cache_budget_mb=cache_budget_mb,
+        features=features,
     )
 
 
@@ -63,6 +76,8 @@ def analyze_repositories(
     urls: list,
     max_commits: int = 500,
     parallel_workers: int = 1,
+    executor: str = "thread",
+    commit_workers: int = 1,
     output_format: str = "dict",
     energy_tracking: bool = False,
     energy_backend: str = "rapl",
@@ -77,12 +92,27 @@ def analyze_repositories(
     commit_order: str = "newest_first",
     shallow_clone: bool = True,
     clone_depth: int = None,
+    keyword_matching: str = "substring",
+    diff_analysis: bool = False,
+    analysis_level: str = "full",
+    features: list = None,
+    mirror_cache: bool = False,
+    cache_budget_mb: int = None,
+    full_history: bool = False,
+    clone_filter: str = "auto",
+    incremental: bool = False,
+    state_dir: str = None,
 ):
     # Analyze multiple repositories from URLs.
     # Args:
     #   urls: List of GitHub repository URLs
     #   max_commits: Maximum commits to analyze per repository
     #   parallel_workers: Number of parallel analysis workers (1=sequential)
+    #   executor: "thread" (default) or "process" (one analyzer per worker process,
+    #             for CPU-bound features such as diff, structural and methods)
+    #   commit_workers: Worker processes per repository, each analyzing contiguous
+    #                   chunks of its commits (merged in commit order); ignored when
+    #                   parallel_workers > 1, as the repositories are split instead
     #   output_format: Output format (dict, json, csv)
     #   energy_tracking: Enable automatic energy measurement during analysis
     #   energy_backend: Energy backend (rapl, codecarbon, cpu_meter, auto)
@@ -95,8 +125,24 @@ def analyze_repositories(
     #   cleanup_after: Remove cloned repos after analysis (default True)
     #   skip_merges: Skip merge commits (default True)
     #   commit_order: "newest_first" (default) or "oldest_first"
-    #   shallow_clone: Use shallow cloning to reduce download size (default True)
-    #   clone_depth: Git clone depth (auto-calculated from max_commits if None)
+    #   shallow_clone: Fetch only the history the analysis needs (default True)
+    #   clone_depth: Initial clone depth (auto-calculated from max_commits if None)
+    #   keyword_matching: "substring" (default) or "token" (word-boundary aware)
+    #   diff_analysis: Detect green patterns in code diffs (CodeDiffAnalyzer)
+    #   analysis_level: "full" (default) or "message" (git log fast path: message
+    #                   heuristics and line counts, no diffs, Lizard or DMM)
+    #   features: Explicit per-commit feature tiers (message, stats, diff, structural,
+    #             dmm, methods, source); overrides analysis_level and the flags above
+    #   mirror_cache: Reuse bare mirrors in greenmining_repos/mirrors, updated with git
+    #                 fetch (shared with clone_repositories; replaces cleanup_after)
+    #   cache_budget_mb: Mirror cache disk budget (LRU eviction, None = unlimited)
+    #   full_history: Fetch the complete history instead of deepening adaptively
+    #   clone_filter: Partial clone filter: "auto" (from features), "blob:none",
+    #                 "tree:0" or None for full-object clones
+    #   incremental: Analyze only commits the previous run's stored results lack, merged
+    #                in and trimmed to the window and max_commits (full recompute when
+    #                settings or patterns change)
+    #   state_dir: Incremental state directory (default greenmining_repos/state)
     from greenmining.services.local_repo_analyzer import LocalRepoAnalyzer
 
     kwargs = {}
@@ -108,6 +154,10 @@ def analyze_repositories(
         from datetime import datetime
 
         kwargs["to_date"] = datetime.strptime(to_date, "%Y-%m-%d")
+    if state_dir:
+        from pathlib import Path
+
+        kwargs["state_dir"] = Path(state_dir)
 
     analyzer = LocalRepoAnalyzer(
         max_commits=max_commits,
@@ -122,6 +172,16 @@ def analyze_repositories(
         commit_order=commit_order,
         shallow_clone=shallow_clone,
         clone_depth=clone_depth,
+        keyword_matching=keyword_matching,
+        diff_analysis=diff_analysis,
+        analysis_level=analysis_level,
+        features=features,
+        mirror_cache=mirror_cache,
+        cache_budget_mb=cache_budget_mb,
+        full_history=full_history,
+        clone_filter=clone_filter,
+        incremental=incremental,
+        commit_workers=commit_workers,
         **kwargs,
     )
 
@@ -129,7 +189,42 @@ def analyze_repositories(
         urls=urls,
         parallel_workers=parallel_workers,
         output_format=output_format,
+        executor=executor,
+    )
+
+
+def bulk_classify(
+    input_path: str,
+    output_path: str,
+    workers: int = 1,
+    chunk_size: int = 50_000,
+    message_column: str = "message",
+    keyword_matching: str = "substring",
+    pattern_files: list = None,
+    snapshot_dir: str = None,
+):
+    # Classify an offline commit dump (CSV, JSONL or Parquet) on a process pool.
+    # Args:
+    #   input_path: Commit file to read (streamed in chunks)
+    #   output_path: Annotated output file (format taken from its extension)
+    #   workers: Worker processes (1 = single process)
+    #   chunk_size: Rows per chunk
+    #   message_column: Column holding the commit message
+    #   keyword_matching: "substring" (default) or "token"
+    #   pattern_files: Extra YAML/JSON pattern files merged into this run's catalogue
+    #   snapshot_dir: Compiled matcher snapshot directory
+    # Returns: dict with commit counts and throughput (commits_per_second)
+    from greenmining.services.bulk_classifier import BulkClassifier
+
+    classifier = BulkClassifier(
+        workers=workers,
+        chunk_size=chunk_size,
+        message_column=message_column,
+        keyword_matching=keyword_matching,
+        pattern_files=pattern_files,
+        snapshot_dir=snapshot_dir,
     )
+    return classifier.classify_file(input_path, output_path)
 
 
 __all__ = [
@@ -137,8 +232,12 @@ __all__ = [
     "GREEN_KEYWORDS",
     "is_green_aware",
     "get_pattern_by_keywords",
+    "classify_messages",
+    "load_custom_patterns",
+    "use_pattern_snapshots",
     "fetch_repositories",
     "clone_repositories",
     "analyze_repositories",
+    "bulk_classify",
     "__version__",
 ]
@@ -1,12 +1,55 @@
 # Allow running greenmining as a module: python -m greenmining
 # This is a library - use Python API for programmatic access.
+# The only command-line entry point is bulk classification of commit dumps:
+#   python -m greenmining bulk-classify commits.csv classified.parquet --workers 8
+
+import argparse
+import sys
 
 from greenmining import __version__
 
+
+def _bulk_classify_command(argv: list) -> int:
+    from greenmining import bulk_classify
+
+    parser = argparse.ArgumentParser(
+        prog="python -m greenmining bulk-classify",
+        description="Classify a CSV/JSONL/Parquet commit dump against the GSF patterns.",
+    )
+    parser.add_argument("input", help="Input commit file (.csv, .jsonl, .parquet)")
+    parser.add_argument("output", help="Output file; format taken from the extension")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per chunk")
+    parser.add_argument("--message-column", default="message", help="Commit message column")
+    parser.add_argument("--keyword-matching", choices=["substring", "token"], default="substring")
+    parser.add_argument(
+        "--patterns", action="append", default=[], help="Extra YAML/JSON pattern file"
+    )
+    parser.add_argument("--snapshot-dir", help="Compiled matcher snapshot directory")
+    args = parser.parse_args(argv)
+
+    bulk_classify(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        message_column=args.message_column,
+        keyword_matching=args.keyword_matching,
+        pattern_files=args.patterns,
+        snapshot_dir=args.snapshot_dir,
+    )
+    return 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bulk-classify":
+        sys.exit(_bulk_classify_command(sys.argv[2:]))
+
     print(f"greenmining v{__version__}")
     print("This is a Python library for analyzing green software patterns.")
     print("\nUsage:")
     print("  from greenmining import GSF_PATTERNS, is_green_aware, get_pattern_by_keywords")
     print("  from greenmining.services import GitHubFetcher, CommitExtractor, DataAnalyzer")
+    print("\nBulk classification:")
+    print("  python -m greenmining bulk-classify commits.csv classified.csv --workers 8")
     print("\nDocumentation: https://github.com/adam-bouafia/greenmining")
@@ -1,12 +1,16 @@
 # Analyzers for GreenMining framework.
 
 from .code_diff_analyzer import CodeDiffAnalyzer
+from .diff_guards import DiffGuards
 from .metrics_power_correlator import CorrelationResult, MetricsPowerCorrelator
 from .statistical_analyzer import StatisticalAnalyzer
+from .streaming_diff_analyzer import StreamingDiffAnalyzer
 from .temporal_analyzer import TemporalAnalyzer
 
 __all__ = [
     "CodeDiffAnalyzer",
+    "DiffGuards",
+    "StreamingDiffAnalyzer",
     "StatisticalAnalyzer",
     "TemporalAnalyzer",
     "MetricsPowerCorrelator",
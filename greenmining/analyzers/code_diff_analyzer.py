@@ -1,10 +1,172 @@
 # Code diff analyzer for detecting green software patterns in code changes.
 
+from __future__ import annotations
+
 import re
+import threading
 from typing import Any
 
 from pydriller import Commit, ModifiedFile
 
+from .diff_guards import CONTENT_SAMPLE_LINES, DiffGuards
+
+# File kinds used to route signature sets
+FILE_KIND_PYTHON = "python"
+FILE_KIND_JAVASCRIPT = "javascript"
+FILE_KIND_CODE = "code"  # Other programming languages
+FILE_KIND_DOCKERFILE = "dockerfile"
+FILE_KIND_K8S = "k8s"
+
+CODE_KINDS = (FILE_KIND_PYTHON, FILE_KIND_JAVASCRIPT, FILE_KIND_CODE)
+FILE_KINDS = CODE_KINDS + (FILE_KIND_DOCKERFILE, FILE_KIND_K8S)
+
+CODE_EXTENSIONS = {
+    ".py": FILE_KIND_PYTHON,
+    ".js": FILE_KIND_JAVASCRIPT,
+    ".ts": FILE_KIND_JAVASCRIPT,
+    ".java": FILE_KIND_CODE,
+    ".go": FILE_KIND_CODE,
+    ".cpp": FILE_KIND_CODE,
+    ".c": FILE_KIND_CODE,
+    ".cs": FILE_KIND_CODE,
+    ".rb": FILE_KIND_CODE,
+    ".php": FILE_KIND_CODE,
+    ".scala": FILE_KIND_CODE,
+    ".kt": FILE_KIND_CODE,
+    ".rs": FILE_KIND_CODE,
+    ".swift": FILE_KIND_CODE,
+}
+
+MANIFEST_EXTENSIONS = (".yaml", ".yml")
+
+# Any of these in a YAML file marks it as a Kubernetes manifest
+K8S_MARKERS = ("kind:", "apiVersion:", "metadata:")
+
+# Path conventions for YAML that is (Helm charts, kustomize, k8s/ directories)
+# or never is (CI workflows, compose files, tool configs) a Kubernetes manifest
+K8S_PATH_RE = re.compile(
+    r"(^|/)(k8s|kubernetes|kube|manifests?|helm|charts|kustomize|overlays|deploy|deployments?)/"
+    r"|(^|/)kustomization\.ya?ml$",
+    re.IGNORECASE,
+)
+NON_K8S_PATH_RE = re.compile(
+    r"(^|/)(\.github|\.gitlab|\.circleci|\.buildkite|\.azure-pipelines)/"
+    r"|(^|/)(docker-compose[^/]*|compose|\.gitlab-ci|\.travis|appveyor|mkdocs|"
+    r"\.pre-commit-config|\.?codecov|environment|\.readthedocs|\.golangci|\.yamllint|"
+    r"pubspec|openapi[^/]*|swagger[^/]*|action|\.clang-format|\.rubocop)\.ya?ml$",
+    re.IGNORECASE,
+)
+
+
+class ManifestDetector:
+    # Classify YAML files as Kubernetes manifests from path conventions and diff
+    # text, without reading file blobs. Verdicts are cached per (repository, path):
+    # a path convention or a marker seen in any diff settles the path for good,
+    # while a diff without markers stays undecided and is re-checked next time.
+    # One detector is shared by the threads of analyze_repositories, so the cache
+    # is only touched under a lock.
+
+    def __init__(self):
+        self._verdicts: dict[tuple[str, str], bool] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def is_manifest(self, path: str, diff_text: str = "", repo: str = "") -> bool:
+        key = (repo, path)
+        with self._lock:
+            verdict = self._verdicts.get(key)
+        if verdict is not None:
+            return verdict
+
+        if NON_K8S_PATH_RE.search(path):
+            verdict = False
+        elif (diff_text and any(k in diff_text for k in K8S_MARKERS)) or K8S_PATH_RE.search(path):
+            verdict = True
+        else:
+            return False  # Undecided: not cached
+
+        with self._lock:
+            self._verdicts[key] = verdict
+        return verdict
+
+    def known(self, path: str, repo: str = "") -> bool | None:
+        # Cached verdict for a path, or None if undecided.
+        with self._lock:
+            return self._verdicts.get((repo, path))
+
+    def remember(self, path: str, repo: str = ""):
+        # Record a path proven to be a manifest (e.g. while streaming a diff).
+        with self._lock:
+            self._verdicts[(repo, path)] = True
+
+    def forget(self, repo: str | None = None):
+        # Drop cached verdicts for one repository, or all of them.
+        with self._lock:
+            if repo is None:
+                self._verdicts.clear()
+            else:
+                for key in [key for key in self._verdicts if key[0] == repo]:
+                    del self._verdicts[key]
+
+
+def path_file_kind(filename: str) -> str | None:
+    # Routing kind decided by file name alone (code extensions, Dockerfiles).
+    # YAML files need their content to tell manifests apart and return None.
+    for ext, kind in CODE_EXTENSIONS.items():
+        if filename.endswith(ext):
+            return kind
+    if "Dockerfile" in filename:
+        return FILE_KIND_DOCKERFILE
+    return None
+
+
+def modified_file_path(modified_file: ModifiedFile) -> str:
+    # Repository-relative path of a modified file (file name as fallback).
+    return (
+        getattr(modified_file, "new_path", None)
+        or getattr(modified_file, "old_path", None)
+        or modified_file.filename
+    )
+
+
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]|()")
+
+# Regex fragments that never contribute to a required literal
+_NON_LITERAL_RE = re.compile(r"\.\*|\\[sSbBdDwW][*+]?|\[[^\]]*\][*+?]?")
+
+
+def required_literal(regex: str) -> str | None:
+    # Longest plain substring every match of the signature must contain (lowercased).
+    # Returns None when no literal can be extracted safely (alternations, groups).
+    if re.search(r"(?<!\\)[|(]", regex):
+        return None
+    best = ""
+    for piece in _NON_LITERAL_RE.split(regex):
+        chars = []
+        index = 0
+        while index < len(piece):
+            char = piece[index]
+            if char == "\\" and index + 1 < len(piece) and not piece[index + 1].isalnum():
+                chars.append(piece[index + 1])
+                index += 2
+                continue
+            if char == "\\" or char in REGEX_METACHARACTERS:
+                chars = []
+                break
+            chars.append(char)
+            index += 1
+        if len(chars) > len(best):
+            best = "".join(chars)
+    return best.lower() or None
+
 
 class CodeDiffAnalyzer:
     # Analyze code diffs to detect green software patterns
@@ -207,32 +369,168 @@ class CodeDiffAnalyzer:
         },
     }
 
+    # File kinds each (pattern, signature type) applies to; untagged signature
+    # types apply to every kind
+    SIGNATURE_FILE_KINDS = {
+        ("caching", "annotations"): CODE_KINDS,
+        ("caching", "function_calls"): CODE_KINDS,
+        ("resource_optimization", "kubernetes"): (FILE_KIND_K8S,),
+        ("resource_optimization", "docker"): (FILE_KIND_DOCKERFILE,),
+        ("database_optimization", "query_optimization"): CODE_KINDS,
+        ("async_processing", "keywords"): CODE_KINDS,
+        ("async_processing", "patterns"): CODE_KINDS,
+        ("lazy_loading", "patterns"): CODE_KINDS,
+        ("container_optimization", "base_images"): (FILE_KIND_DOCKERFILE,),
+        ("container_optimization", "techniques"): (FILE_KIND_DOCKERFILE,),
+        ("auto_scaling", "kubernetes"): (FILE_KIND_K8S,),
+        ("code_splitting", "webpack"): (FILE_KIND_JAVASCRIPT,),
+        ("code_splitting", "react"): (FILE_KIND_JAVASCRIPT,),
+        ("green_ml_training", "frameworks"): (FILE_KIND_PYTHON,),
+    }
+
+    def __init__(self, guards: DiffGuards | None = None):
+        # Args:
+        #   guards: Skip/budget rules for huge, generated, vendored and minified
+        #           files (default: DiffGuards(); DiffGuards.unlimited() disables them)
+        self.guards = guards or DiffGuards()
+        self.manifests = ManifestDetector()
+
+        # Compile each signature family once into a single case-insensitive
+        # alternation, so a diff line costs one search per family instead of one
+        # re.search (and re-cache lookup) per signature. One set is compiled per
+        # file kind holding only the signatures that apply to it.
+        self._family_regexes = self._compile_signatures(self.PATTERN_SIGNATURES)
+        self._kind_regexes = {
+            kind: self._compile_signatures(self.PATTERN_SIGNATURES, self.SIGNATURE_FILE_KINDS, kind)
+            for kind in FILE_KINDS
+        }
+
+    @staticmethod
+    def _compile_signatures(
+        signatures: dict[str, dict[str, list[str]]],
+        file_kinds: dict[tuple[str, str], tuple[str, ...]] | None = None,
+        file_kind: str | None = None,
+    ) -> list[tuple[str, tuple[str, ...] | None, re.Pattern]]:
+        # Build (pattern_name, required literals, compiled alternation) per family,
+        # in PATTERN_SIGNATURES order. A family's regex can only match a line that
+        # contains one of its literals, so most lines are rejected with plain
+        # substring tests; literals is None when some signature has none.
+        # With a file_kind, signature types tagged for other kinds are left out.
+        compiled = []
+        for pattern_name, signature_types in signatures.items():
+            regexes = []
+            for signature_type, patterns in signature_types.items():
+                kinds = (file_kinds or {}).get((pattern_name, signature_type))
+                if file_kind is None or kinds is None or file_kind in kinds:
+                    regexes.extend(regex for regex in patterns if regex not in regexes)
+            if not regexes:
+                continue
+
+            literals = [required_literal(regex) for regex in regexes]
+            if None in literals:
+                prefilter = None
+            else:
+                # A literal containing a shorter one is redundant
+                unique = sorted(set(literals), key=len)
+                prefilter = tuple(
+                    lit for i, lit in enumerate(unique) if not any(s in lit for s in unique[:i])
+                )
+
+            alternation = "|".join(f"(?:{regex})" for regex in regexes)
+            compiled.append((pattern_name, prefilter, re.compile(alternation, re.IGNORECASE)))
+        return compiled
+
     def analyze_commit_diff(self, commit: Commit) -> dict[str, Any]:
         # Analyze code changes in a commit to detect green patterns.
-        patterns_detected = []
-        evidence = {}
-        metrics = self._calculate_metrics(commit)
+        return self.analyze_modified_files(
+            commit.modified_files,
+            self._calculate_metrics(commit),
+            repo=getattr(commit, "project_path", ""),
+        )
+
+    def analyze_modified_files(
+        self, modified_files: list[ModifiedFile], metrics: dict[str, int], repo: str = ""
+    ) -> dict[str, Any]:
+        # Analyze already-loaded modified files with precomputed change metrics,
+        # so callers that traverse commits themselves do not re-read any diff.
+        # Guarded files are recorded in the result's "skipped" list; repo scopes
+        # the cached Kubernetes manifest verdicts.
+        guards = self.guards
+        evidence: dict[str, list[str]] = {}
+        skipped: list[dict[str, Any]] = []
+        lines_scanned = 0
+
+        for modified_file in modified_files:
+            filename = modified_file.filename
+            # Skip non-code files before touching any content
+            if path_file_kind(filename) is None and not filename.endswith(MANIFEST_EXTENSIONS):
+                continue
 
-        for modified_file in commit.modified_files:
-            # Skip non-code files
-            if not self._is_code_file(modified_file):
+            path = modified_file_path(modified_file)
+            reason = guards.path_skip_reason(path)
+            if reason:
+                skipped.append({"path": path, "reason": reason})
+                continue
+
+            # Others only run the signatures for their kind
+            file_kind = self._file_kind(modified_file, repo)
+            if file_kind is None:
                 continue
 
             # Analyze additions
-            if modified_file.diff_parsed and modified_file.diff_parsed.get("added"):
-                for line in modified_file.diff_parsed["added"]:
-                    detected = self._detect_patterns_in_line(line[1])  # line[1] is content
-                    patterns_detected.extend(detected)
+            added = (modified_file.diff_parsed or {}).get("added")
+            if not added:
+                continue
+
+            reason = guards.content_skip_reason(added[:CONTENT_SAMPLE_LINES])
+            if reason:
+                skipped.append({"path": path, "reason": reason})
+                continue
+
+            budget = guards.file_budget(lines_scanned)
+            if budget is not None and len(added) > budget:
+                if budget == 0:
+                    skipped.append({"path": path, "reason": "commit_budget"})
+                    continue
+                skipped.append(
+                    {
+                        "path": path,
+                        "reason": "sampled",
+                        "added_lines": len(added),
+                        "scanned_lines": budget,
+                    }
+                )
+                added = guards.sample(added, budget)
+            lines_scanned += len(added)
+
+            for line_no, content in added:
+                self._collect_line(evidence, filename, line_no, content, file_kind)
 
-                    for pattern in detected:
-                        if pattern not in evidence:
-                            evidence[pattern] = []
-                        evidence[pattern].append(
-                            f"{modified_file.filename}:{line[0]} - {line[1][:80]}"
-                        )
+        return self._build_result(evidence, metrics, skipped)
 
-        # Deduplicate patterns
-        patterns_detected = list(set(patterns_detected))
+    def _collect_line(
+        self,
+        evidence: dict[str, list[str]],
+        filename: str,
+        line_no: int,
+        content: str,
+        file_kind: str | None,
+    ):
+        # Detect patterns in one added line and record evidence per pattern
+        # (at most guards.max_evidence_per_pattern strings each).
+        for pattern in self._detect_patterns_in_line(content, file_kind):
+            entries = evidence.setdefault(pattern, [])
+            if self.guards.keep_evidence(len(entries)):
+                entries.append(f"{filename}:{line_no} - {content[:80]}")
+
+    def _build_result(
+        self,
+        evidence: dict[str, list[str]],
+        metrics: dict[str, int],
+        skipped: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        # Assemble the diff analysis result; patterns are the evidence keys.
+        patterns_detected = list(evidence)
 
         # Confidence scoring
         confidence = self._calculate_diff_confidence(patterns_detected, evidence, metrics)
@@ -242,19 +540,23 @@ class CodeDiffAnalyzer:
             "confidence": confidence,
             "evidence": evidence,
             "metrics": metrics,
+            "skipped": skipped or [],
         }
 
-    def _detect_patterns_in_line(self, code_line: str) -> list[str]:
+    def _detect_patterns_in_line(self, code_line: str, file_kind: str | None = None) -> list[str]:
         # Detect patterns in a single line of code.
+        # file_kind restricts detection to the signatures routed to that kind.
+        # Non-ASCII lines skip the literal prefilter: IGNORECASE folds characters
+        # such as the Kelvin sign that str.lower() leaves alone.
+        text = code_line.lower() if code_line.isascii() else None
         detected = []
-
-        for pattern_name, signatures in self.PATTERN_SIGNATURES.items():
-            for _signature_type, patterns in signatures.items():
-                for pattern_regex in patterns:
-                    if re.search(pattern_regex, code_line, re.IGNORECASE):
-                        detected.append(pattern_name)
-                        break
-
+        family_regexes = self._kind_regexes[file_kind] if file_kind else self._family_regexes
+        for pattern_name, literals, regex in family_regexes:
+            if text is not None and literals is not None:
+                if not any(literal in text for literal in literals):
+                    continue
+            if regex.search(code_line):
+                detected.append(pattern_name)
         return detected
 
     def _calculate_metrics(self, commit: Commit) -> dict[str, int]:
@@ -293,36 +595,26 @@ class CodeDiffAnalyzer:
 
     def _is_code_file(self, modified_file: ModifiedFile) -> bool:
         # Check if file is a code file (not config, docs, etc.).
-        code_extensions = [
-            ".py",
-            ".java",
-            ".go",
-            ".js",
-            ".ts",
-            ".cpp",
-            ".c",
-            ".cs",
-            ".rb",
-            ".php",
-            ".scala",
-            ".kt",
-            ".rs",
-            ".swift",
-        ]
-
-        # Check file extension
-        for ext in code_extensions:
-            if modified_file.filename.endswith(ext):
-                return True
-
-        # Also analyze Dockerfiles and Kubernetes manifests
-        if "Dockerfile" in modified_file.filename:
-            return True
-        if modified_file.filename.endswith((".yaml", ".yml")):
-            # Check if it's a Kubernetes manifest
-            if modified_file.source_code and any(
-                k in modified_file.source_code for k in ["kind:", "apiVersion:", "metadata:"]
-            ):
-                return True
-
-        return False
+        return self._file_kind(modified_file) is not None
+
+    def _file_kind(self, modified_file: ModifiedFile, repo: str = "") -> str | None:
+        # Classify a modified file into a signature routing kind, or None to skip it.
+        filename = modified_file.filename
+
+        # Check file extension (and Dockerfiles)
+        kind = path_file_kind(filename)
+        if kind is not None:
+            return kind
+
+        # Also analyze Kubernetes manifests, judged from path and diff text only
+        # (reading source_code would fetch the full blob of every YAML file)
+        if filename.endswith(MANIFEST_EXTENSIONS):
+            path = modified_file_path(modified_file)
+            if self.manifests.known(path, repo) is None:
+                diff_text = modified_file.diff or ""
+            else:
+                diff_text = ""
+            if self.manifests.is_manifest(path, diff_text, repo):
+                return FILE_KIND_K8S
+
+        return None
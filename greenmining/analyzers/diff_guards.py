@@ -0,0 +1,122 @@
+# Guards that keep huge, generated, vendored and minified diffs from stalling analysis.
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Any
+
+# Linguist-style vendored paths (dependency trees checked into the repository)
+VENDORED_RE = re.compile(
+    r"(^|/)(node_modules|bower_components|jspm_packages|vendor|vendors|third[_-]?party|"
+    r"Godeps/_workspace|\.yarn|site-packages|\.?venv|Pods|Carthage/Checkouts)/",
+    re.IGNORECASE,
+)
+
+# Linguist-style generated files: lockfiles, protobuf/gRPC stubs, designer files, source maps
+GENERATED_RE = re.compile(
+    r"(^|/)(package-lock\.json|npm-shrinkwrap\.json|yarn\.lock|pnpm-lock\.yaml|Cargo\.lock|"
+    r"poetry\.lock|Pipfile\.lock|Gemfile\.lock|composer\.lock|go\.sum|packages\.lock\.json)$"
+    r"|\.pb\.(go|cc|h)$|_pb2(_grpc)?\.pyi?$|\.pb\.swift$|_grpc\.pb\.go$"
+    r"|\.generated\.[^/]+$|\.designer\.cs$|\.(js|css)\.map$",
+    re.IGNORECASE,
+)
+
+MINIFIED_RE = re.compile(r"[.-]min\.(js|css)$", re.IGNORECASE)
+
+# Header comments emitted by code generators
+GENERATED_MARKER_RE = re.compile(
+    r"code generated .*do not edit|@generated|<auto-generated|autogenerated file", re.IGNORECASE
+)
+
+# Added lines inspected for minification; generated markers count only within the
+# file's first CONTENT_SAMPLE_LINES lines (its header)
+CONTENT_SAMPLE_LINES = 5
+
+# Mean length of the sampled lines above which a file is treated as minified
+MINIFIED_LINE_LENGTH = 500
+
+
+@dataclass
+class DiffGuards:
+    # Limits applied before diff lines reach the signature engine or Lizard.
+    # A None budget or cap means unlimited.
+
+    exclude_globs: tuple[str, ...] = ()
+    skip_vendored: bool = True
+    skip_generated: bool = True
+    skip_minified: bool = True
+    max_lines_per_file: int | None = 5_000
+    max_lines_per_commit: int | None = 20_000
+    max_evidence_per_pattern: int | None = 20
+
+    @classmethod
+    def unlimited(cls) -> DiffGuards:
+        # Guards that skip nothing (previous behaviour).
+        return cls(
+            skip_vendored=False,
+            skip_generated=False,
+            skip_minified=False,
+            max_lines_per_file=None,
+            max_lines_per_commit=None,
+            max_evidence_per_pattern=None,
+        )
+
+    def path_skip_reason(self, path: str) -> str | None:
+        # Reason to skip a file based on its path alone, or None.
+        # Globs match the full path, the file name, or any path suffix
+        # ("node_modules/*", "*.lock", "dist/*").
+        if not path:
+            return None
+        path = path.replace("\\", "/")
+        name = path.rsplit("/", 1)[-1]
+        for glob in self.exclude_globs:
+            if fnmatch(path, glob) or fnmatch(name, glob) or fnmatch(path, f"*/{glob}"):
+                return "excluded"
+        if self.skip_vendored and VENDORED_RE.search(path):
+            return "vendored"
+        if self.skip_generated and GENERATED_RE.search(path):
+            return "generated"
+        if self.skip_minified and MINIFIED_RE.search(path):
+            return "minified"
+        return None
+
+    def content_skip_reason(self, head_lines: list[tuple[int, str]]) -> str | None:
+        # Reason to skip a file based on its first added (line number, content) pairs,
+        # or None. A generated marker only counts in the file header, so a hunk deeper
+        # in a hand-written file that mentions "@generated" is still analyzed.
+        head_lines = head_lines[:CONTENT_SAMPLE_LINES]
+        if not head_lines:
+            return None
+        if self.skip_generated and any(
+            line_no <= CONTENT_SAMPLE_LINES and GENERATED_MARKER_RE.search(content)
+            for line_no, content in head_lines
+        ):
+            return "generated"
+        if self.skip_minified:
+            mean_length = sum(len(content) for _no, content in head_lines) / len(head_lines)
+            if mean_length >= MINIFIED_LINE_LENGTH:
+                return "minified"
+        return None
+
+    def file_budget(self, commit_lines_used: int) -> int | None:
+        # Lines a file may still scan given the lines already scanned in the commit.
+        budgets = [b for b in (self.max_lines_per_file,) if b is not None]
+        if self.max_lines_per_commit is not None:
+            budgets.append(max(self.max_lines_per_commit - commit_lines_used, 0))
+        return min(budgets) if budgets else None
+
+    @staticmethod
+    def sample(lines: list[Any], budget: int) -> list[Any]:
+        # Evenly spaced, deterministic sample of at most budget lines.
+        if budget <= 0:
+            return []
+        if len(lines) <= budget:
+            return lines
+        step = len(lines) / budget
+        return [lines[int(i * step)] for i in range(budget)]
+
+    def keep_evidence(self, stored: int) -> bool:
+        # Whether another evidence string may be stored for a pattern.
+        return self.max_evidence_per_pattern is None or stored < self.max_evidence_per_pattern
@@ -0,0 +1,326 @@
+# Streaming diff analyzer over raw `git log -p` output.
+
+from __future__ import annotations
+
+import codecs
+import io
+import os
+import re
+import subprocess
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from .code_diff_analyzer import (
+    FILE_KIND_K8S,
+    K8S_MARKERS,
+    MANIFEST_EXTENSIONS,
+    CodeDiffAnalyzer,
+    path_file_kind,
+)
+from .diff_guards import CONTENT_SAMPLE_LINES
+
+# Record separator starting every commit header line; diff body lines always
+# start with a diff marker (" ", "+", "-", "@", "\\", "d", ...) so it is unambiguous
+COMMIT_MARKER = "\x1e"
+
+HUNK_HEADER_RE = re.compile(r"^@@+ (?:-\d+(?:,\d+)? )+\+(\d+)(?:,\d+)? @@")
+
+
+def _unquote_path(path: str) -> str:
+    # Undo git's C-style quoting of unusual paths ("a\tb", octal UTF-8 bytes).
+    if len(path) >= 2 and path.startswith('"') and path.endswith('"'):
+        raw = codecs.escape_decode(path[1:-1].encode("utf-8"))[0]
+        return raw.decode("utf-8", "replace")
+    return path
+
+
+def _strip_prefix(path: str) -> str | None:
+    # "+++ b/dir/file.py" -> "dir/file.py"; /dev/null -> None.
+    path = _unquote_path(path.rstrip("\n").split("\t", 1)[0])
+    if path == "/dev/null":
+        return None
+    return path[2:] if path[:2] in ("a/", "b/") else path
+
+
+class StreamingDiffAnalyzer:
+    # Detect green patterns from one `git log -p --no-color` subprocess per repository.
+    # Hunks are parsed incrementally and only added lines reach the signature
+    # engine, so no PyDriller Commit/ModifiedFile objects are built. Code files are
+    # scanned line by line; a YAML hunk is held only until the file is known to be
+    # a Kubernetes manifest, so memory is bounded by the largest single hunk.
+
+    def __init__(self, diff_analyzer: CodeDiffAnalyzer | None = None):
+        # Args:
+        #   diff_analyzer: Signature engine to use (default: a new CodeDiffAnalyzer)
+        self.diff_analyzer = diff_analyzer or CodeDiffAnalyzer()
+
+    def analyze_repository(
+        self,
+        repo_path: str,
+        rev: str = "HEAD",
+        since: str | None = None,
+        until: str | None = None,
+        max_count: int | None = None,
+        extra_args: Iterable[str] = (),
+    ) -> Iterator[dict[str, Any]]:
+        # Yield one diff analysis result per commit, newest first.
+        # Args:
+        #   repo_path: Local repository path
+        #   rev: Revision or range passed to git log
+        #   since / until: Optional date bounds (git log --since/--until)
+        #   max_count: Optional commit limit
+        #   extra_args: Additional git log arguments (e.g. path filters after "--")
+        command = [
+            "git",
+            "-C",
+            str(repo_path),
+            "-c",
+            "core.quotePath=false",
+            "log",
+            "-p",
+            "--no-color",
+            "--no-ext-diff",
+            "--no-renames",
+            f"--format={COMMIT_MARKER}%H",
+        ]
+        if since:
+            command.append(f"--since={since}")
+        if until:
+            command.append(f"--until={until}")
+        if max_count:
+            command.append(f"--max-count={max_count}")
+        command.append(rev)
+        command.extend(extra_args)
+
+        # stderr goes to a file so a chatty git can never block on a full pipe;
+        # stdout is split on "\n" only, since diff content may contain bare "\r"
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                env={**os.environ, "GIT_PAGER": "cat"},
+            )
+            stdout = io.TextIOWrapper(
+                process.stdout, encoding="utf-8", errors="replace", newline="\n"
+            )
+            try:
+                yield from self.analyze_stream(stdout, repo=str(repo_path))
+            finally:
+                # Stop git early if the consumer stops iterating
+                if process.poll() is None:
+                    process.kill()
+                stdout.close()
+                returncode = process.wait()
+                if returncode > 0:
+                    stderr.seek(0)
+                    message = stderr.read().decode("utf-8", "replace").strip()
+                    raise RuntimeError(f"git log failed for {repo_path}: {message}")
+
+    def analyze_stream(self, lines: Iterable[str], repo: str = "") -> Iterator[dict[str, Any]]:
+        # Parse `git log -p --format=\x1e%H` output and yield per-commit results.
+        # repo scopes the cached Kubernetes manifest verdicts.
+        state = None
+        in_header = False
+        line_no = 0
+
+        for line in lines:
+            if line.startswith(COMMIT_MARKER):
+                if state is not None:
+                    yield state.finish()
+                state = _CommitDiffState(self.diff_analyzer, line[1:].strip(), repo)
+                in_header = False
+                continue
+            if state is None:
+                continue
+
+            if line.startswith("diff --git "):
+                # Provisional path for mode-only and binary changes
+                state.start_file(_strip_prefix(line[11:].rstrip("\n").rsplit(" b/", 1)[-1]) or "")
+                in_header = True
+                continue
+
+            if in_header:
+                if line.startswith("+++ "):
+                    new_path = _strip_prefix(line[4:])
+                    if new_path is not None:
+                        state.set_path(new_path)
+                    continue
+                if not line.startswith("@@"):
+                    continue
+                in_header = False
+
+            if line.startswith("@@"):
+                state.end_hunk()
+                match = HUNK_HEADER_RE.match(line)
+                line_no = int(match.group(1)) if match else 0
+                continue
+
+            marker = line[:1]
+            if marker == "+":
+                state.add_line(line_no, line[1:].rstrip("\n"))
+                line_no += 1
+            elif marker == "-":
+                state.removed += 1
+            elif marker == " ":
+                state.context_line(line)
+                line_no += 1
+
+        if state is not None:
+            yield state.finish()
+
+
+class _CommitDiffState:
+    # Incremental per-commit state for StreamingDiffAnalyzer.
+    # Added lines of the current file are held in pending only until the file's
+    # verdict is known (content guards checked, and for YAML, manifest seen), and
+    # at most until the end of the current hunk.
+
+    def __init__(self, diff_analyzer: CodeDiffAnalyzer, commit_hash: str, repo: str = ""):
+        self.analyzer = diff_analyzer
+        self.guards = diff_analyzer.guards
+        self.manifests = diff_analyzer.manifests
+        self.repo = repo
+        self.commit_hash = commit_hash
+        self.evidence: dict[str, list[str]] = {}
+        self.skipped: list[dict[str, Any]] = []
+        self.added = 0
+        self.removed = 0
+        self.files = 0
+        self.lines_scanned = 0
+        self.path: str | None = None
+        self._reset_file()
+
+    def start_file(self, path: str):
+        self.end_file()
+        self.files += 1
+        self._reset_file()
+        self.set_path(path)
+
+    def _reset_file(self):
+        self.pending: list[tuple[int, str]] = []
+        self.content_checked = False
+        self.is_manifest = False
+        self.skip_reason = None
+        self.file_added = 0
+        self.file_scanned = 0
+        self.truncated = False
+        self.guard_checked = False
+
+    def set_path(self, path: str):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.file_kind = path_file_kind(self.filename)
+        self.is_manifest_candidate = self.filename.endswith(MANIFEST_EXTENSIONS)
+        self.is_manifest = False
+        if self.file_kind is None and self.is_manifest_candidate:
+            # Cached verdicts and path conventions settle most YAML files up front
+            if self.manifests.is_manifest(path, repo=self.repo):
+                self.is_manifest = True
+            elif self.manifests.known(path, self.repo) is False:
+                self.is_manifest_candidate = False
+
+    def _mark_manifest(self):
+        self.is_manifest = True
+        self.manifests.remember(self.path, self.repo)
+
+    def _analyzable(self) -> bool:
+        # Path guards run once per file, when its final path is known.
+        if self.file_kind is None and not self.is_manifest_candidate:
+            return False
+        if not self.guard_checked:
+            self.guard_checked = True
+            self.skip_reason = self.guards.path_skip_reason(self.path)
+            if self.skip_reason:
+                self.skipped.append({"path": self.path, "reason": self.skip_reason})
+        return self.skip_reason is None
+
+    def add_line(self, line_no: int, content: str):
+        self.added += 1
+        if self.path is None or not self._analyzable():
+            return
+        self.file_added += 1
+        if self.truncated:
+            return
+        if self.file_kind is None and not self.is_manifest:
+            if any(k in content for k in K8S_MARKERS):
+                self._mark_manifest()
+        self.pending.append((line_no, content))
+        if not self.content_checked and len(self.pending) >= CONTENT_SAMPLE_LINES:
+            self._check_content()
+        if self.content_checked:
+            self._flush()
+
+    def context_line(self, line: str):
+        if self.path is not None and self.file_kind is None and self.is_manifest_candidate:
+            if not self.is_manifest and any(k in line for k in K8S_MARKERS):
+                self._mark_manifest()
+
+    def _check_content(self):
+        self.content_checked = True
+        reason = self.guards.content_skip_reason(self.pending)
+        if reason:
+            self.skip_reason = reason
+            self.skipped.append({"path": self.path, "reason": reason})
+            self.pending.clear()
+
+    def _flush(self):
+        # Scan held lines if the file's kind is settled (code file or manifest).
+        if self.skip_reason or not self.pending:
+            return
+        if self.file_kind is None and not self.is_manifest:
+            return
+        file_kind = self.file_kind or FILE_KIND_K8S
+        budgets = []
+        if self.guards.max_lines_per_file is not None:
+            budgets.append(self.guards.max_lines_per_file - self.file_scanned)
+        if self.guards.max_lines_per_commit is not None:
+            budgets.append(self.guards.max_lines_per_commit - self.lines_scanned)
+        budget = min(budgets) if budgets else None
+        for line_no, content in self.pending:
+            if budget is not None and budget <= 0:
+                self.truncated = True
+                break
+            self.analyzer._collect_line(self.evidence, self.filename, line_no, content, file_kind)
+            self.file_scanned += 1
+            self.lines_scanned += 1
+            if budget is not None:
+                budget -= 1
+        self.pending.clear()
+
+    def end_hunk(self):
+        # YAML lines that never proved to be a manifest are dropped with the hunk.
+        if self.path is None:
+            return
+        if self.pending and not self.content_checked:
+            self._check_content()
+        self._flush()
+        self.pending.clear()
+
+    def end_file(self):
+        if self.path is None:
+            return
+        self.end_hunk()
+        if self.truncated:
+            # Streamed lines cannot be sampled evenly; the head of the file is kept
+            self.skipped.append(
+                {
+                    "path": self.path,
+                    "reason": "truncated" if self.file_scanned else "commit_budget",
+                    "added_lines": self.file_added,
+                    "scanned_lines": self.file_scanned,
+                }
+            )
+
+    def finish(self) -> dict[str, Any]:
+        self.end_file()
+        metrics = {
+            "lines_added": self.added,
+            "lines_removed": self.removed,
+            "files_changed": self.files,
+            "net_lines": self.added - self.removed,
+            "complexity_change": 0,
+        }
+        result = self.analyzer._build_result(self.evidence, metrics, self.skipped)
+        return {"commit_hash": self.commit_hash, **result}
@@ -6,6 +6,8 @@ from pathlib import Path
 
 from greenmining.models.repository import Repository
 from greenmining.services.github_graphql_fetcher import GitHubGraphQLFetcher
+from greenmining.services.local_repo_analyzer import clone_filter_for
+from greenmining.services.mirror_cache import MirrorCache
 from greenmining.utils import colored_print, load_json_file, save_json_file
 
 
@@ -71,14 +73,28 @@ class RepositoryController:
         self,
         repositories: list[Repository],
         cleanup_existing: bool = False,
+        mirror_cache: bool = False,
+        cache_budget_mb: int = None,
+        features: list[str] = None,
     ) -> list[Path]:
         # Clone repositories into ./greenmining_repos with sanitized directory names.
+        # With mirror_cache, bare mirrors are cloned or fetched in the cache that
+        # LocalRepoAnalyzer(mirror_cache=True) uses, and their paths are returned.
+        # With features, partial clones without a checkout carry only the objects
+        # those feature tiers read (see clone_filter_for).
         self.repos_dir.mkdir(parents=True, exist_ok=True)
 
         if cleanup_existing and self.repos_dir.exists():
             shutil.rmtree(self.repos_dir)
             self.repos_dir.mkdir(parents=True, exist_ok=True)
 
+        clone_args = []
+        if features is not None:
+            clone_args = [f"--filter={clone_filter_for(features)}"]
+
+        if mirror_cache:
+            return self._update_mirrors(repositories, cache_budget_mb, clone_args)
+
         cloned_paths = []
         colored_print(f"\nCloning {len(repositories)} repositories into {self.repos_dir}", "cyan")
 
@@ -98,7 +114,16 @@ class RepositoryController:
                 import subprocess
 
                 subprocess.run(
-                    ["git", "clone", "--depth", "1", url, str(local_path)],
+                    [
+                        "git",
+                        "clone",
+                        "--depth",
+                        "1",
+                        *clone_args,
+                        *(["--no-checkout"] if clone_args else []),
+                        url,
+                        str(local_path),
+                    ],
                     capture_output=True,
                     text=True,
                     check=True,
@@ -113,6 +138,34 @@ class RepositoryController:
         colored_print(f"Cloned {len(cloned_paths)}/{len(repositories)} repositories", "green")
         return cloned_paths
 
+    def _update_mirrors(
+        self,
+        repositories: list[Repository],
+        cache_budget_mb: int = None,
+        clone_args: list[str] = (),
+    ):
+        # Clone or fetch a bare mirror per repository in the shared mirror cache.
+        cache = MirrorCache.for_root(
+            self.repos_dir, cache_budget_mb * 1024 * 1024 if cache_budget_mb else None
+        )
+        mirror_paths = []
+        colored_print(f"\nUpdating {len(repositories)} mirrors in {cache.mirrors_dir}", "cyan")
+
+        for repo in repositories:
+            url = repo.url if hasattr(repo, "url") else f"https://github.com/{repo.full_name}"
+            try:
+                mirror_paths.append(cache.acquire(url, clone_args=tuple(clone_args)))
+            except Exception as e:
+                colored_print(f"   Failed to mirror {repo.full_name}: {e}", "yellow")
+
+        # Evict older mirrors while this batch is still pinned
+        cache.evict()
+        for path in mirror_paths:
+            cache.release(path, evict=False)
+
+        colored_print(f"Mirrored {len(mirror_paths)}/{len(repositories)} repositories", "green")
+        return mirror_paths
+
     def _sanitize_repo_name(self, repo: Repository) -> str:
         # Safe unique directory name: owner_repo. Handles case collisions.
         base = re.sub(r"[^a-z0-9-]", "_", repo.full_name.replace("/", "_").lower())
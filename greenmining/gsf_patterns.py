@@ -1,5 +1,27 @@
 # Green Software Foundation Patterns
 
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from types import MappingProxyType
+
+from greenmining.pattern_matcher import (
+    BaseMatcher,
+    ClassificationCache,
+    KeywordMatcher,
+    MatchResult,
+    MessageClassification,
+    TokenMatcher,
+)
+from greenmining.pattern_snapshot import (
+    DEFAULT_SNAPSHOT_DIR,
+    catalogue_fingerprint,
+    load_or_compile,
+    load_pattern_file,
+)
+
 GSF_PATTERNS = {
     # ==================== CLOUD PATTERNS (40+) ====================
     "cache_static_data": {
@@ -1599,21 +1621,169 @@ GREEN_KEYWORDS = [
 ]
 
 
-def get_pattern_by_keywords(commit_message: str) -> list:
-    # Match commit message against GSF patterns.
-    message_lower = commit_message.lower()
-    matched_patterns = []
+# Immutable pattern id -> detail index shared by all analysis results. Results
+# store pattern ids only; names and details are resolved when exporting.
+DETAIL_FIELDS = ("name", "category", "description", "sci_impact")
+
+_pattern_details: dict[str, Mapping[str, str]] = {}
+_pattern_details_by_name: dict[str, Mapping[str, str]] = {}
+PATTERN_DETAILS: Mapping[str, Mapping[str, str]] = MappingProxyType(_pattern_details)
+PATTERN_DETAILS_BY_NAME: Mapping[str, Mapping[str, str]] = MappingProxyType(
+    _pattern_details_by_name
+)
+
+
+def _refresh_pattern_details():
+    # Rebuild the detail index after the catalogue changes.
+    _pattern_details.clear()
+    _pattern_details_by_name.clear()
+    for pattern_id, pattern in GSF_PATTERNS.items():
+        detail = MappingProxyType({key: pattern.get(key, "") for key in DETAIL_FIELDS})
+        _pattern_details[pattern_id] = detail
+        _pattern_details_by_name[detail["name"]] = detail
+
+
+_refresh_pattern_details()
+
+
+def get_pattern_names(pattern_ids: Iterable[str]) -> list[str]:
+    # Resolve pattern ids to display names.
+    return [PATTERN_DETAILS[pid]["name"] for pid in pattern_ids if pid in PATTERN_DETAILS]
+
+
+def get_pattern_details(pattern_ids: Iterable[str]) -> list[dict[str, str]]:
+    # Resolve pattern ids to exportable detail dicts (name, category, description, sci_impact).
+    return [dict(PATTERN_DETAILS[pid]) for pid in pattern_ids if pid in PATTERN_DETAILS]
+
+
+# Keyword matching strategies: "substring" reproduces the original substring
+# semantics; "token" matches on word boundaries via an inverted keyword index.
+MATCHER_MODES = {
+    "substring": KeywordMatcher,
+    "token": TokenMatcher,
+}
+
+_matchers: dict[str, BaseMatcher] = {}
+
+# Classification memo shared by every analyzer in the process (LocalRepoAnalyzer,
+# DataAnalyzer, batch classification). Identical messages from forks, cherry-picks
+# and bot commits are classified once.
+_classification_cache = ClassificationCache()
+
+
+def get_classification_cache() -> ClassificationCache:
+    # Return the shared classification cache (use .stats() to size it, .resize(0) to disable).
+    return _classification_cache
+
 
-    for _pattern_id, pattern in GSF_PATTERNS.items():
-        for keyword in pattern["keywords"]:
-            if keyword.lower() in message_lower:
-                matched_patterns.append(pattern["name"])
-                break
+# Directory for compiled matcher snapshots (None = compile in memory only)
+_snapshot_dir: Path | None = (
+    Path(os.environ["GREENMINING_PATTERN_SNAPSHOT_DIR"])
+    if os.environ.get("GREENMINING_PATTERN_SNAPSHOT_DIR")
+    else None
+)
 
-    return matched_patterns
+
+def use_pattern_snapshots(snapshot_dir: str | Path | None = DEFAULT_SNAPSHOT_DIR):
+    # Load compiled matchers from (and save them to) snapshot_dir; None disables.
+    # Snapshots carry a content hash of the catalogue and are rebuilt when it changes.
+    # Can also be enabled with the GREENMINING_PATTERN_SNAPSHOT_DIR environment variable.
+    global _snapshot_dir
+    _snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+    _matchers.clear()
+
+
+def load_custom_patterns(*paths: str | Path) -> list[str]:
+    # Merge extra patterns and green keywords from YAML/JSON files into the catalogue.
+    # Patterns with an existing id replace the built-in definition. Returns the merged ids.
+    merged_ids = []
+    for path in paths:
+        patterns, green_keywords = load_pattern_file(path)
+        GSF_PATTERNS.update(patterns)
+        GREEN_KEYWORDS.extend(k for k in green_keywords if k not in GREEN_KEYWORDS)
+        merged_ids.extend(patterns)
+
+    _refresh_pattern_details()
+    _matchers.clear()
+    return merged_ids
+
+
+def set_catalogue(patterns: dict[str, dict], green_keywords: list[str]):
+    # Replace the active catalogue, e.g. with the parent's in a spawned pool worker.
+    GSF_PATTERNS.clear()
+    GSF_PATTERNS.update(patterns)
+    GREEN_KEYWORDS[:] = green_keywords
+    _refresh_pattern_details()
+    _matchers.clear()
+
+
+def catalogue_hash() -> str:
+    # Content hash of the active pattern catalogue.
+    return catalogue_fingerprint(GSF_PATTERNS, GREEN_KEYWORDS)
+
+
+def _compile_matcher(
+    mode: str,
+    patterns: dict[str, dict],
+    green_keywords: list[str],
+    snapshot_dir: str | Path | None,
+) -> BaseMatcher:
+    if mode not in MATCHER_MODES:
+        raise ValueError(f"Unknown matcher mode: {mode} (expected one of {list(MATCHER_MODES)})")
+    if snapshot_dir is not None:
+        matcher = load_or_compile(MATCHER_MODES[mode], patterns, green_keywords, snapshot_dir)
+    else:
+        matcher = MATCHER_MODES[mode](patterns, green_keywords)
+    matcher.cache = _classification_cache
+    return matcher
+
+
+def get_matcher(mode: str = "substring") -> BaseMatcher:
+    # Return the shared matcher compiled from GSF_PATTERNS and GREEN_KEYWORDS.
+    matcher = _matchers.get(mode)
+    if matcher is None:
+        matcher = _compile_matcher(mode, GSF_PATTERNS, GREEN_KEYWORDS, _snapshot_dir)
+        _matchers[mode] = matcher
+    return matcher
+
+
+def build_matcher(
+    mode: str = "substring",
+    pattern_files: Iterable[str | Path] = (),
+    snapshot_dir: str | Path | None = None,
+) -> BaseMatcher:
+    # Compile a private matcher from the active catalogue plus pattern_files, leaving
+    # the shared catalogue and matchers untouched (unlike load_custom_patterns).
+    # snapshot_dir defaults to the use_pattern_snapshots setting.
+    patterns = dict(GSF_PATTERNS)
+    green_keywords = list(GREEN_KEYWORDS)
+    for path in pattern_files:
+        extra_patterns, extra_keywords = load_pattern_file(path)
+        patterns.update(extra_patterns)
+        green_keywords.extend(k for k in extra_keywords if k not in green_keywords)
+    return _compile_matcher(mode, patterns, green_keywords, snapshot_dir or _snapshot_dir)
+
+
+def match_message(
+    commit_message: str, mode: str = "substring", with_spans: bool = False
+) -> MatchResult:
+    # Single-pass match returning green flag, pattern ids and matched keywords.
+    # with_spans=True also returns (keyword, start, end) evidence from the same scan.
+    return get_matcher(mode).match(commit_message, with_spans=with_spans)
+
+
+def classify_messages(messages, mode: str = "substring") -> MessageClassification:
+    # Classify a list or pandas Series of commit messages in one batch.
+    # Returns a boolean green vector and a scipy.sparse CSR commit x pattern matrix
+    # whose columns follow GSF_PATTERNS order.
+    return get_matcher(mode).classify(messages)
+
+
+def get_pattern_by_keywords(commit_message: str) -> list:
+    # Match commit message against GSF patterns.
+    return get_matcher().match(commit_message).pattern_names
 
 
 def is_green_aware(commit_message: str) -> bool:
     # Check if commit shows green software awareness.
-    message_lower = commit_message.lower()
-    return any(keyword.lower() in message_lower for keyword in GREEN_KEYWORDS)
+    return get_matcher().match(commit_message).green_aware
@@ -0,0 +1,537 @@
+# Compiled multi-keyword matcher for GSF pattern and green keyword detection.
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from scipy import sparse
+
+
+@dataclass
+class MatchResult:
+    # Outcome of a single scan over a commit message.
+
+    green_aware: bool
+    pattern_ids: list[str] = field(default_factory=list)
+    pattern_names: list[str] = field(default_factory=list)
+    keywords: list[str] = field(default_factory=list)
+    # (keyword, start, end) offsets into the original message; only filled
+    # when the match was requested with_spans=True
+    spans: list[tuple[str, int, int]] = field(default_factory=list)
+
+    def highlight(self, message: str, before: str = "**", after: str = "**") -> str:
+        # Wrap every matched keyword occurrence in markers (overlaps are merged).
+        merged: list[list[int]] = []
+        for _keyword, start, end in sorted(self.spans, key=lambda span: span[1:]):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+
+        parts = []
+        position = 0
+        for start, end in merged:
+            parts.append(message[position:start])
+            parts.append(f"{before}{message[start:end]}{after}")
+            position = end
+        parts.append(message[position:])
+        return "".join(parts)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "green_aware": self.green_aware,
+            "pattern_ids": self.pattern_ids,
+            "pattern_names": self.pattern_names,
+            "keywords": self.keywords,
+            "spans": [list(span) for span in self.spans],
+        }
+
+
+@dataclass
+class MessageClassification:
+    # Batch classification result: one row per message, one column per pattern.
+
+    green: np.ndarray
+    patterns: sparse.csr_matrix
+    pattern_ids: list[str]
+    pattern_names: list[str]
+
+    def __len__(self) -> int:
+        return len(self.green)
+
+    def pattern_counts(self) -> dict[str, int]:
+        # Number of messages matching each pattern, keyed by pattern name.
+        counts = self.patterns.sum(axis=0).A1
+        return {name: int(c) for name, c in zip(self.pattern_names, counts) if c}
+
+    def patterns_for(self, row: int) -> list[str]:
+        # Pattern names matched by a single message.
+        start, end = self.patterns.indptr[row], self.patterns.indptr[row + 1]
+        return [self.pattern_names[i] for i in self.patterns.indices[start:end]]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        # Dense indicator frame with "pattern_<id>" columns (StatisticalAnalyzer layout).
+        import pandas as pd
+
+        frame = pd.DataFrame(
+            self.patterns.toarray().astype("uint8"),
+            columns=[f"pattern_{pid}" for pid in self.pattern_ids],
+        )
+        frame.insert(0, "green_aware", self.green)
+        return frame
+
+
+class ClassificationCache:
+    # Thread-safe, size-bounded LRU cache of message classifications.
+    # Keys are a 128-bit BLAKE2 digest of the message (never the message itself),
+    # namespaced per compiled matcher so different modes and catalogues never mix.
+    # A maxsize of 0 disables caching.
+
+    def __init__(self, maxsize: int = 50_000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[int, bytes], tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def message_key(message: str) -> bytes:
+        # Digest used as the cache key for a message.
+        return hashlib.blake2b(message.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get(self, key: tuple[int, bytes]) -> tuple | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple[int, bytes], value: tuple):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize: int):
+        # Change the capacity, evicting least recently used entries if needed.
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        # Drop all entries and reset statistics.
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        # Hit/miss statistics for sizing the cache.
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Distinct cache namespace per compiled matcher instance
+_matcher_namespaces = itertools.count()
+
+
+class BaseMatcher(ABC):
+    # Shared keyword registry and result assembly for compiled matchers.
+    # Subclasses compile their own index in _compile() and implement _scan().
+
+    def __init__(self, patterns: dict[str, dict[str, Any]], green_keywords: list[str]):
+        # Compile the matcher.
+        # Args:
+        #   patterns: Pattern catalogue in GSF_PATTERNS format
+        #   green_keywords: Keywords that flag a commit as green-aware
+        self.pattern_ids = list(patterns)
+        self.pattern_names = {pid: patterns[pid]["name"] for pid in self.pattern_ids}
+        self.keywords: list[str] = []
+        self._keyword_ids: dict[str, int] = {}
+        self._keyword_patterns: list[set[int]] = []
+        self._keyword_green: list[bool] = []
+
+        for index, pattern_id in enumerate(self.pattern_ids):
+            for keyword in patterns[pattern_id]["keywords"]:
+                keyword_id = self._register(keyword)
+                if keyword_id is not None:
+                    self._keyword_patterns[keyword_id].add(index)
+
+        for keyword in green_keywords:
+            keyword_id = self._register(keyword)
+            if keyword_id is not None:
+                self._keyword_green[keyword_id] = True
+
+        self._keyword_patterns_sorted = [tuple(sorted(p)) for p in self._keyword_patterns]
+        self._compile()
+
+        # Optional shared ClassificationCache (assigned by gsf_patterns.get_matcher)
+        self.cache: ClassificationCache | None = None
+        self._cache_namespace = next(_matcher_namespaces)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Snapshots carry compiled tables only, never the process-local cache.
+        state = self.__dict__.copy()
+        state["cache"] = None
+        state.pop("_cache_namespace", None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self._cache_namespace = next(_matcher_namespaces)
+
+    def _register(self, keyword: str) -> int | None:
+        # Assign a stable id to a lowercased keyword.
+        # Empty keywords would match every message and are ignored.
+        keyword = keyword.lower()
+        if not keyword:
+            return None
+        keyword_id = self._keyword_ids.get(keyword)
+        if keyword_id is None:
+            keyword_id = len(self.keywords)
+            self._keyword_ids[keyword] = keyword_id
+            self.keywords.append(keyword)
+            self._keyword_patterns.append(set())
+            self._keyword_green.append(False)
+        return keyword_id
+
+    @abstractmethod
+    def _compile(self):
+        # Build the matcher's index over self.keywords.
+        pass
+
+    @abstractmethod
+    def _scan(self, text: str, spans: list | None = None) -> dict[int, int]:
+        # Return {keyword_id: end offset of first occurrence} for a lowercased text.
+        # When a spans list is given, every occurrence is also appended to it as
+        # (keyword_id, start, end) during the same pass.
+        pass
+
+    def _classify(self, commit_message: str) -> tuple[bool, tuple[int, ...], tuple[int, ...]]:
+        # Return (green flag, pattern column indices, matched keyword ids), memoized
+        # through the shared cache when one is attached.
+        cache = self.cache
+        if cache is not None and cache.maxsize > 0:
+            key = (self._cache_namespace, cache.message_key(commit_message))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        else:
+            key = None
+
+        found = self._scan(commit_message.lower())
+        if found:
+            green_aware, matched = self._resolve(found)
+            value = (green_aware, tuple(matched), tuple(found))
+        else:
+            value = (False, (), ())
+
+        if key is not None:
+            cache.put(key, value)
+        return value
+
+    def match_indices(self, commit_message: str) -> tuple[bool, list[int]]:
+        # Scan a message and return (green flag, sorted pattern column indices).
+        green_aware, matched, _keywords = self._classify(commit_message or "")
+        return green_aware, list(matched)
+
+    def _resolve(self, found: dict[int, int]) -> tuple[bool, list[int]]:
+        # Map matched keyword ids to the green flag and pattern column indices.
+        keyword_green = self._keyword_green
+        keyword_patterns = self._keyword_patterns_sorted
+        matched: set[int] = set()
+        green_aware = False
+        for keyword_id in found:
+            if keyword_green[keyword_id]:
+                green_aware = True
+            matched.update(keyword_patterns[keyword_id])
+        return green_aware, sorted(matched)
+
+    def classify(self, messages: Iterable[str]) -> MessageClassification:
+        # Classify many messages into a green vector and a sparse commit x pattern matrix.
+        import numpy as np
+        from scipy import sparse
+
+        green: list[bool] = []
+        indices: list[int] = []
+        indptr = [0]
+        for message in messages:
+            if not isinstance(message, str):
+                message = ""  # None / NaN from pandas
+            green_aware, matched = self.match_indices(message)
+            green.append(green_aware)
+            indices.extend(matched)
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (
+                np.ones(len(indices), dtype=bool),
+                np.asarray(indices, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int64),
+            ),
+            shape=(len(green), len(self.pattern_ids)),
+        )
+        return MessageClassification(
+            green=np.asarray(green, dtype=bool),
+            patterns=matrix,
+            pattern_ids=list(self.pattern_ids),
+            pattern_names=[self.pattern_names[pid] for pid in self.pattern_ids],
+        )
+
+    def _classify_with_spans(
+        self, commit_message: str
+    ) -> tuple[bool, tuple[int, ...], tuple[int, ...], list[tuple[int, int, int]]]:
+        # Uncached scan that also collects every keyword occurrence.
+        # Offsets are mapped back to the original message when lowercasing changes
+        # its length (e.g. "İ" lowers to two code points).
+        text = commit_message.lower()
+        spans: list[tuple[int, int, int]] = []
+        found = self._scan(text, spans)
+        if not found:
+            return False, (), (), []
+
+        if len(text) != len(commit_message):
+            offsets = []
+            for index, char in enumerate(commit_message):
+                offsets.extend([index] * len(char.lower()))
+            spans = [(k, offsets[start], offsets[end - 1] + 1) for k, start, end in spans]
+
+        green_aware, matched = self._resolve(found)
+        return green_aware, tuple(matched), tuple(found), spans
+
+    def match(self, commit_message: str, with_spans: bool = False) -> MatchResult:
+        # Scan a message once and return green flag, pattern ids and keywords.
+        # with_spans=True also records (keyword, start, end) evidence for every
+        # occurrence; such scans bypass the classification cache.
+        if with_spans:
+            green_aware, matched, keyword_ids, spans = self._classify_with_spans(
+                commit_message or ""
+            )
+        else:
+            green_aware, matched, keyword_ids = self._classify(commit_message or "")
+            spans = []
+        if not keyword_ids:
+            return MatchResult(green_aware=False)
+
+        pattern_ids = [self.pattern_ids[i] for i in matched]
+        keywords = self.keywords
+        return MatchResult(
+            green_aware=green_aware,
+            pattern_ids=pattern_ids,
+            pattern_names=[self.pattern_names[pid] for pid in pattern_ids],
+            keywords=[keywords[k] for k in keyword_ids],
+            spans=[(keywords[k], start, end) for k, start, end in spans],
+        )
+
+    def is_green_aware(self, commit_message: str) -> bool:
+        # Check if any green keyword occurs in the message.
+        return self.match(commit_message).green_aware
+
+
+class KeywordMatcher(BaseMatcher):
+    # Aho-Corasick automaton built once from GSF_PATTERNS and GREEN_KEYWORDS.
+    # A message is lowercased and scanned a single time; every keyword occurrence
+    # (including overlapping ones) is reported, so results are identical to the
+    # per-keyword substring tests it replaces.
+
+    def _compile(self):
+        # Build goto, failure and output tables (output lists include suffix matches).
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[tuple[int, ...]] = [()]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append(())
+                state = next_state
+            outputs[state] = outputs[state] + (keyword_id,)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(char, 0)
+                fail[next_state] = target if target != next_state else 0
+                outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self._alphabet = frozenset(goto[0]).union(*(g.keys() for g in goto))
+
+    def _scan(self, text: str, spans: list | None = None) -> dict[int, int]:
+        # Return {keyword_id: end offset of first occurrence} for a lowercased text.
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        alphabet = self._alphabet
+        found: dict[int, int] = {}
+        state = 0
+
+        for position, char in enumerate(text):
+            if char not in alphabet:
+                state = 0
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                for keyword_id in outputs[state]:
+                    if keyword_id not in found:
+                        found[keyword_id] = position + 1
+                    if spans is not None:
+                        length = len(self.keywords[keyword_id])
+                        spans.append((keyword_id, position + 1 - length, position + 1))
+
+        return found
+
+
+# Token pattern shared by keywords and messages so multi-word and punctuated
+# keywords ("service mesh", "pub/sub", "c++", "n+1") tokenize identically.
+TOKEN_RE = re.compile(r"\w+[+#]*")
+
+# Keyword tokens at least this long also match as word prefixes ("optimiz" ->
+# "optimizing"); shorter ones ("go", "arm", "gc", "iac", "h2") must match a whole
+# word, optionally pluralized.
+MIN_PREFIX_LENGTH = 4
+
+
+class TokenMatcher(BaseMatcher):
+    # Word-boundary-aware matcher driven by an inverted keyword index.
+    # Each message is tokenized once; every token is looked up (with its plural and
+    # prefix forms) in a first-token -> keywords index, and multi-word keywords are
+    # confirmed against the following tokens. Cost grows with message length, not
+    # with the size of the keyword catalogue.
+
+    def _compile(self):
+        # Build the inverted index: first keyword token -> (single-word keyword ids,
+        # multi-word keywords as (keyword_id, middle tokens, last token)).
+        singles: dict[str, list[int]] = {}
+        phrases: dict[str, list[tuple[int, list[str], str]]] = {}
+        for keyword_id, keyword in enumerate(self.keywords):
+            tokens = TOKEN_RE.findall(keyword)
+            if not tokens:
+                continue
+            if len(tokens) == 1:
+                singles.setdefault(tokens[0], []).append(keyword_id)
+            else:
+                phrases.setdefault(tokens[0], []).append((keyword_id, tokens[1:-1], tokens[-1]))
+
+        self._index = {
+            key: (tuple(singles.get(key, ())), tuple(phrases.get(key, ())))
+            for key in set(singles) | set(phrases)
+        }
+        self._max_key_length = max((len(key) for key in self._index), default=0)
+        # Memoized token -> candidate index entries; natural-language vocabularies
+        # are small, and the cap keeps hash-like tokens from growing it unbounded.
+        self._candidates: dict[str, tuple] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = super().__getstate__()
+        state["_candidates"] = {}
+        return state
+
+    @staticmethod
+    def _token_matches(keyword_token: str, token: str) -> bool:
+        # Whole-word match, plural, or word-prefix match for long keyword tokens.
+        if token == keyword_token:
+            return True
+        if token.startswith(keyword_token):
+            suffix = token[len(keyword_token) :]
+            return suffix in ("s", "es") or len(keyword_token) >= MIN_PREFIX_LENGTH
+        return False
+
+    def _candidates_for(self, token: str) -> tuple:
+        # Index entries whose first token can match this token.
+        # Returns (single-word keyword ids, multi-word keywords anchored on this exact token).
+        cached = self._candidates.get(token)
+        if cached is not None:
+            return cached
+
+        keys = {token}
+        if token.endswith("s"):
+            keys.add(token[:-1])
+            if token.endswith("es"):
+                keys.add(token[:-2])
+        upper = min(len(token), self._max_key_length + 1)
+        keys.update(token[:length] for length in range(MIN_PREFIX_LENGTH, upper))
+
+        index = self._index
+        single_ids: list[int] = []
+        for key in keys:
+            if key in index and self._token_matches(key, token):
+                single_ids.extend(index[key][0])
+        phrases = index[token][1] if token in index else ()
+
+        candidates = (tuple(single_ids), phrases)
+        if len(self._candidates) < 100_000:
+            self._candidates[token] = candidates
+        return candidates
+
+    def _scan(self, text: str, spans: list | None = None) -> dict[int, int]:
+        # Return {keyword_id: end offset of first occurrence} for a lowercased text.
+        token_matches = self._token_matches
+        candidates_for = self._candidates_for
+        matches = list(TOKEN_RE.finditer(text))
+        tokens = [m.group() for m in matches]
+        count = len(tokens)
+        found: dict[int, int] = {}
+
+        for position, token in enumerate(tokens):
+            single_ids, phrases = candidates_for(token)
+            for keyword_id in single_ids:
+                if keyword_id not in found:
+                    found[keyword_id] = matches[position].end()
+                if spans is not None:
+                    spans.append((keyword_id, *matches[position].span()))
+            for keyword_id, middle, last_token in phrases:
+                end = position + len(middle) + 1
+                if (keyword_id in found and spans is None) or end >= count:
+                    continue
+                if tokens[position + 1 : end] == middle and token_matches(last_token, tokens[end]):
+                    found.setdefault(keyword_id, matches[end].end())
+                    if spans is not None:
+                        spans.append((keyword_id, matches[position].start(), matches[end].end()))
+
+        return found
@@ -0,0 +1,179 @@
+# Versioned on-disk snapshots of compiled pattern matchers and custom pattern files.
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import tempfile
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from greenmining.pattern_matcher import BaseMatcher
+
+# Bump when the pickled matcher layout changes so old snapshots are rebuilt
+SNAPSHOT_FORMAT = 1
+
+DEFAULT_SNAPSHOT_DIR = Path.home() / ".cache" / "greenmining" / "patterns"
+
+# Snapshots kept per matcher type (several catalogues may share one directory)
+MAX_SNAPSHOTS_PER_MATCHER = 8
+
+REQUIRED_PATTERN_FIELDS = ("name", "keywords")
+
+
+@cache
+def implementation_hash(matcher_cls: type[BaseMatcher]) -> str | None:
+    # Hash of the source of the modules defining matcher_cls and its bases, so an
+    # upgrade that changes tokenization or the compiled tables rebuilds snapshots.
+    # None when the source is unavailable (e.g. a frozen build).
+    digest = hashlib.sha256()
+    modules = sorted({cls.__module__ for cls in matcher_cls.__mro__ if cls is not object})
+    try:
+        for name in modules:
+            digest.update(Path(inspect.getfile(sys.modules[name])).read_bytes())
+    except (KeyError, OSError, TypeError):
+        return None
+    return digest.hexdigest()
+
+
+def catalogue_fingerprint(
+    patterns: dict[str, dict[str, Any]],
+    green_keywords: list[str],
+    matcher_cls: type[BaseMatcher] | None = None,
+) -> str:
+    # Content hash of a pattern catalogue (and matcher class and its source).
+    # Pattern order is significant: it defines the column order of batch results.
+    payload = {
+        "format": SNAPSHOT_FORMAT,
+        "matcher": matcher_cls.__name__ if matcher_cls else None,
+        "implementation": implementation_hash(matcher_cls) if matcher_cls else None,
+        "patterns": [[pid, patterns[pid]] for pid in patterns],
+        "green_keywords": list(green_keywords),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def load_pattern_file(path: str | Path) -> tuple[dict[str, dict[str, Any]], list[str]]:
+    # Load extra patterns and green keywords from a YAML or JSON file.
+    # Expected layout:
+    #   patterns:
+    #     my_pattern_id:
+    #       name: "My Pattern"
+    #       category: "custom"
+    #       keywords: ["foo", "bar"]
+    #       description: "..."
+    #       sci_impact: "..."
+    #   green_keywords: ["foo"]
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Pattern file not found: {path}")
+
+    with open(path, encoding="utf-8") as f:
+        if path.suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError(
+                    "PyYAML is required for YAML pattern files. Install with: pip install pyyaml"
+                ) from e
+            data = yaml.safe_load(f) or {}
+        else:
+            data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Pattern file {path} must contain a mapping")
+
+    patterns = {}
+    for pattern_id, pattern in (data.get("patterns") or {}).items():
+        missing = [key for key in REQUIRED_PATTERN_FIELDS if key not in pattern]
+        if missing:
+            raise ValueError(f"Pattern '{pattern_id}' in {path} is missing {', '.join(missing)}")
+        if not isinstance(pattern["keywords"], list):
+            raise ValueError(f"Pattern '{pattern_id}' in {path}: keywords must be a list")
+        patterns[str(pattern_id)] = {
+            "name": pattern["name"],
+            "category": pattern.get("category", "custom"),
+            "keywords": [str(k) for k in pattern["keywords"]],
+            "description": pattern.get("description", ""),
+            "sci_impact": pattern.get("sci_impact", ""),
+        }
+
+    green_keywords = [str(k) for k in data.get("green_keywords") or []]
+    return patterns, green_keywords
+
+
+def snapshot_path(snapshot_dir: Path, matcher_cls: type[BaseMatcher], fingerprint: str) -> Path:
+    # File name carries the matcher type and catalogue hash.
+    return snapshot_dir / f"{matcher_cls.__name__.lower()}-{fingerprint[:20]}.pkl"
+
+
+def save_snapshot(matcher: BaseMatcher, path: Path, fingerprint: str) -> None:
+    # Atomically write a compiled matcher snapshot.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".snapshot-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(
+                {"format": SNAPSHOT_FORMAT, "fingerprint": fingerprint, "matcher": matcher},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def load_snapshot(path: Path, fingerprint: str) -> BaseMatcher | None:
+    # Load a snapshot; returns None if missing, unreadable or stale.
+    # Snapshots are pickles: only load them from a directory you trust.
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("format") != SNAPSHOT_FORMAT
+        or data.get("fingerprint") != fingerprint
+    ):
+        return None
+    return data["matcher"]
+
+
+def load_or_compile(
+    matcher_cls: type[BaseMatcher],
+    patterns: dict[str, dict[str, Any]],
+    green_keywords: list[str],
+    snapshot_dir: str | Path | None = None,
+) -> BaseMatcher:
+    # Return a compiled matcher, reusing a snapshot whose content hash matches.
+    # A changed catalogue hashes differently, so it is compiled and snapshotted anew;
+    # the oldest snapshots beyond MAX_SNAPSHOTS_PER_MATCHER are pruned.
+    snapshot_dir = Path(snapshot_dir) if snapshot_dir else DEFAULT_SNAPSHOT_DIR
+    fingerprint = catalogue_fingerprint(patterns, green_keywords, matcher_cls)
+    path = snapshot_path(snapshot_dir, matcher_cls, fingerprint)
+
+    matcher = load_snapshot(path, fingerprint) if path.exists() else None
+    if matcher is not None:
+        return matcher
+
+    matcher = matcher_cls(patterns, green_keywords)
+    try:
+        save_snapshot(matcher, path, fingerprint)
+        snapshots = sorted(
+            snapshot_dir.glob(f"{matcher_cls.__name__.lower()}-*.pkl"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        for stale in snapshots[MAX_SNAPSHOTS_PER_MATCHER:]:
+            stale.unlink(missing_ok=True)
+    except OSError:
+        pass  # Read-only or full cache directory: keep the in-memory matcher
+    return matcher
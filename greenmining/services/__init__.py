@@ -1,5 +1,6 @@
 # Services Package - Core business logic and data processing services.
 
+from .bulk_classifier import BulkClassifier
 from .commit_extractor import CommitExtractor
 from .data_aggregator import DataAggregator
 from .data_analyzer import DataAnalyzer
@@ -19,6 +20,7 @@ __all__ = [
     "DataAnalyzer",
     "DataAggregator",
     "ReportGenerator",
+    "BulkClassifier",
     "LocalRepoAnalyzer",
     "CommitAnalysis",
     "RepositoryAnalysis",
@@ -0,0 +1,86 @@
+# Persistent per-repository analysis state for incremental re-analysis.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from greenmining.services.mirror_cache import mirror_name
+
+if TYPE_CHECKING:
+    from greenmining.services.local_repo_analyzer import RepositoryAnalysis
+
+# Bump when the stored layout changes so old state is recomputed
+STATE_FORMAT = 1
+
+
+def settings_fingerprint(settings: dict[str, Any]) -> str:
+    # Content hash of the analysis settings that shape per-commit results.
+    payload = {"format": STATE_FORMAT, "settings": settings}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@dataclass
+class RepositoryState:
+    # Stored analysis of one repository and the high-water mark it reached.
+
+    url: str
+    last_commit: str
+    settings_fingerprint: str
+    catalogue_hash: str
+    analysis: RepositoryAnalysis
+
+    def matches(self, settings_fingerprint: str, catalogue_hash: str) -> bool:
+        # Whether the stored commits were analyzed with these settings and patterns.
+        return (
+            self.settings_fingerprint == settings_fingerprint
+            and self.catalogue_hash == catalogue_hash
+        )
+
+
+class AnalysisStateStore:
+    # One state file per repository URL under root. States are pickles: only
+    # load them from a directory you trust.
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, url: str) -> Path:
+        return self.root / f"{mirror_name(url)[:-4]}.pkl"
+
+    def load(self, url: str) -> RepositoryState | None:
+        # Stored state for url; None if missing, unreadable or of an older format.
+        try:
+            with open(self.path(url), "rb") as f:
+                data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if not isinstance(data, dict) or data.get("format") != STATE_FORMAT:
+            return None
+        return data["state"]
+
+    def save(self, state: RepositoryState) -> None:
+        # Atomically write the state of state.url.
+        path = self.path(state.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".state-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(
+                    {"format": STATE_FORMAT, "state": state}, f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def forget(self, url: str) -> None:
+        # Drop the stored state so the next run analyzes url from scratch.
+        self.path(url).unlink(missing_ok=True)
@@ -0,0 +1,351 @@
+# Multi-process bulk classifier for offline commit corpora (CSV, JSONL, Parquet).
+
+from __future__ import annotations
+
+import tempfile
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from greenmining import gsf_patterns
+from greenmining.pattern_matcher import BaseMatcher
+from greenmining.utils import colored_print
+
+COMPRESSION_SUFFIXES = (".gz", ".bz2", ".xz", ".zst", ".zip")
+
+
+def detect_format(path: str | Path) -> str:
+    # Infer file format (csv, jsonl, parquet) from the file name.
+    name = Path(path).name.lower()
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith(".parquet"):
+        return "parquet"
+    raise ValueError(f"Unsupported commit file format: {path} (expected .csv, .jsonl or .parquet)")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for Parquet files. Install with: pip install pyarrow"
+        ) from e
+    return pa, pq
+
+
+def _annotation_schema(pa):
+    # Arrow types of the columns _annotate appends (list columns for Parquet output).
+    return pa.schema(
+        [
+            ("green_aware", pa.bool_()),
+            ("gsf_pattern_ids", pa.list_(pa.string())),
+            ("gsf_patterns_matched", pa.list_(pa.string())),
+            ("pattern_count", pa.int64()),
+            ("confidence", pa.string()),
+        ]
+    )
+
+
+def _unify_schemas(pa, left, right):
+    # Schema holding the columns of both, in order of appearance. A column inferred
+    # with two types gets their common type: null takes the other type, numbers
+    # widen, and types without one fall back to string.
+    fields = {field.name: field.type for field in left}
+    for field in right:
+        current = fields.setdefault(field.name, field.type)
+        if current == field.type:
+            continue
+        try:
+            unified = pa.unify_schemas(
+                [pa.schema([("c", current)]), pa.schema([("c", field.type)])],
+                promote_options="permissive",
+            )
+            fields[field.name] = unified.field("c").type
+        except (pa.ArrowInvalid, pa.ArrowTypeError, NotImplementedError):
+            fields[field.name] = pa.string()
+    return pa.schema(list(fields.items()))
+
+
+def _conform(pa, table, schema):
+    # table cast to schema; columns it lacks are filled with nulls.
+    columns = [
+        (
+            table.column(field.name).cast(field.type)
+            if field.name in table.column_names
+            else pa.nulls(len(table), field.type)
+        )
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class _ParquetOutput:
+    # Parquet output of annotated chunks. A Parquet file has a single schema, but the
+    # types pandas infers for CSV/JSONL columns can change between chunks (an
+    # all-null column, integers then strings, a JSONL key missing from a chunk), so
+    # those chunks are spooled and written with the unified schema by finish(). A
+    # Parquet input fixes the input column types up front and is written directly.
+
+    def __init__(self, path: Path, input_schema=None):
+        self.pa, self.pq = _import_pyarrow()
+        self.path = path
+        self.added = _annotation_schema(self.pa)
+        self.input_schema = None
+        if input_schema is not None:
+            self.input_schema = self.pa.schema(
+                [field for field in input_schema if field.name not in self.added.names]
+            )
+        self.schema = None
+        self.writer = None
+        self.spool = None
+        self.spooled: list[Path] = []
+
+    def write(self, chunk: pd.DataFrame):
+        pa = self.pa
+        inputs = chunk.drop(columns=self.added.names)
+        table = pa.Table.from_pandas(inputs, schema=self.input_schema, preserve_index=False)
+        table = table.replace_schema_metadata(None)
+        for field in self.added:
+            table = table.append_column(field, pa.array(chunk[field.name], type=field.type))
+
+        if self.input_schema is not None:
+            if self.writer is None:
+                self.writer = self.pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+            return
+
+        if self.spool is None:
+            self.spool = tempfile.TemporaryDirectory(dir=self.path.parent, prefix=".spool-")
+        spooled = Path(self.spool.name) / f"{len(self.spooled)}.parquet"
+        self.pq.write_table(table, spooled)
+        self.spooled.append(spooled)
+        self.schema = (
+            table.schema if self.schema is None else _unify_schemas(pa, self.schema, table.schema)
+        )
+
+    def finish(self):
+        # Write the spooled chunks, in order, with the unified schema.
+        if not self.spooled:
+            return
+        with self.pq.ParquetWriter(self.path, self.schema) as writer:
+            for spooled in self.spooled:
+                writer.write_table(_conform(self.pa, self.pq.read_table(spooled), self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.spool is not None:
+            self.spool.cleanup()
+
+
+# Matcher of a process-pool worker (see _init_worker)
+_worker_matcher: BaseMatcher | None = None
+
+
+def _init_worker(matcher: BaseMatcher):
+    # Process-pool initializer: keep the parent's compiled matcher for every chunk.
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _classify_chunk(
+    messages: list[str], matcher: BaseMatcher | None = None
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Worker task: classify one chunk, returning compact CSR arrays.
+    result = (matcher or _worker_matcher).classify(messages)
+    return result.green, result.patterns.indices, result.patterns.indptr
+
+
+class BulkClassifier:
+    # Stream a commit dump through the GSF classifier on a process pool.
+    # Chunks are read lazily, classified by workers that each hold one compiled
+    # matcher, and written back in input order.
+
+    def __init__(
+        self,
+        workers: int = 1,
+        chunk_size: int = 50_000,
+        message_column: str = "message",
+        keyword_matching: str = "substring",
+        pattern_files: list[str] | None = None,
+        snapshot_dir: str | None = None,
+    ):
+        # Initialize the bulk classifier.
+        # Args:
+        #   workers: Worker processes (1 = classify in the calling process)
+        #   chunk_size: Rows per chunk sent to a worker
+        #   message_column: Column holding the commit message
+        #   keyword_matching: "substring" (default) or "token"
+        #   pattern_files: Extra YAML/JSON pattern files merged into this run's catalogue
+        #   snapshot_dir: Compiled matcher snapshot directory
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.message_column = message_column
+        self.keyword_matching = keyword_matching
+        self.pattern_files = [str(p) for p in pattern_files or []]
+        self.snapshot_dir = str(snapshot_dir) if snapshot_dir else None
+
+    def _read_chunks(self, path: Path, fmt: str) -> Iterator[pd.DataFrame]:
+        # Yield the input file as DataFrame chunks.
+        if fmt == "csv":
+            yield from pd.read_csv(path, chunksize=self.chunk_size)
+        elif fmt == "jsonl":
+            yield from pd.read_json(path, lines=True, chunksize=self.chunk_size)
+        else:
+            _pa, pq = _import_pyarrow()
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=self.chunk_size):
+                yield batch.to_pandas()
+
+    def _annotate(
+        self,
+        chunk: pd.DataFrame,
+        arrays: tuple[np.ndarray, np.ndarray, np.ndarray],
+        fmt: str,
+        matcher: BaseMatcher,
+    ) -> pd.DataFrame:
+        # Append classification columns to a chunk.
+        green, indices, indptr = arrays
+        pattern_ids = matcher.pattern_ids
+        names = matcher.pattern_names
+        ids_per_row = [
+            [pattern_ids[i] for i in indices[indptr[row] : indptr[row + 1]]]
+            for row in range(len(green))
+        ]
+        counts = np.diff(indptr)
+
+        chunk = chunk.copy()
+        chunk["green_aware"] = green
+        if fmt == "csv":
+            chunk["gsf_pattern_ids"] = ["; ".join(ids) for ids in ids_per_row]
+            chunk["gsf_patterns_matched"] = [
+                "; ".join(names[pid] for pid in ids) for ids in ids_per_row
+            ]
+        else:
+            chunk["gsf_pattern_ids"] = ids_per_row
+            chunk["gsf_patterns_matched"] = [[names[pid] for pid in ids] for ids in ids_per_row]
+        chunk["pattern_count"] = counts
+        chunk["confidence"] = np.where(counts >= 2, "high", np.where(counts == 1, "medium", "low"))
+        return chunk
+
+    def _messages(self, chunk: pd.DataFrame) -> list[str]:
+        if self.message_column not in chunk.columns:
+            raise KeyError(
+                f"Column '{self.message_column}' not found (available: {', '.join(chunk.columns)})"
+            )
+        return chunk[self.message_column].tolist()
+
+    def _classified_chunks(
+        self, chunks: Iterator[pd.DataFrame], matcher: BaseMatcher
+    ) -> Iterator[tuple[pd.DataFrame, tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        # Yield (chunk, classification arrays) in input order.
+        if self.workers == 1:
+            for chunk in chunks:
+                yield chunk, _classify_chunk(self._messages(chunk), matcher)
+            return
+
+        # Bounded in-flight window keeps memory proportional to workers x chunk_size
+        max_pending = self.workers * 2
+        pending: deque[tuple[pd.DataFrame, Future]] = deque()
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(matcher,),
+        ) as executor:
+            for chunk in chunks:
+                future = executor.submit(_classify_chunk, self._messages(chunk))
+                pending.append((chunk, future))
+                if len(pending) >= max_pending:
+                    done_chunk, done_future = pending.popleft()
+                    yield done_chunk, done_future.result()
+            while pending:
+                done_chunk, done_future = pending.popleft()
+                yield done_chunk, done_future.result()
+
+    def classify_file(self, input_path: str | Path, output_path: str | Path) -> dict[str, Any]:
+        # Classify every commit in input_path and write the annotated rows to output_path.
+        # Returns throughput statistics.
+        input_path = Path(input_path)
+        output_path = Path(output_path)
+        in_fmt = detect_format(input_path)
+        out_fmt = detect_format(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Private to this run: the shared catalogue stays as it is
+        matcher = gsf_patterns.build_matcher(
+            self.keyword_matching, self.pattern_files, self.snapshot_dir
+        )
+
+        colored_print(
+            f"\nBulk-classifying {input_path} with {self.workers} worker(s), "
+            f"chunk size {self.chunk_size}",
+            "cyan",
+        )
+
+        total = 0
+        green_total = 0
+        parquet_output = None
+        start = time.perf_counter()
+
+        try:
+            chunks = self._read_chunks(input_path, in_fmt)
+            for index, (chunk, arrays) in enumerate(self._classified_chunks(chunks, matcher)):
+                annotated = self._annotate(chunk, arrays, out_fmt, matcher)
+                if out_fmt == "csv":
+                    annotated.to_csv(
+                        output_path, mode="w" if index == 0 else "a", header=index == 0, index=False
+                    )
+                elif out_fmt == "jsonl":
+                    lines = annotated.to_json(orient="records", lines=True, force_ascii=False)
+                    with open(output_path, "w" if index == 0 else "a", encoding="utf-8") as f:
+                        f.write(lines if lines.endswith("\n") else lines + "\n")
+                else:
+                    if parquet_output is None:
+                        input_schema = None
+                        if in_fmt == "parquet":
+                            _pa, pq = _import_pyarrow()
+                            input_schema = pq.ParquetFile(input_path).schema_arrow
+                        parquet_output = _ParquetOutput(output_path, input_schema)
+                    parquet_output.write(annotated)
+
+                total += len(annotated)
+                green_total += int(arrays[0].sum())
+                elapsed = time.perf_counter() - start
+                colored_print(
+                    f"   {total:,} commits classified ({total / elapsed:,.0f} commits/sec)", "cyan"
+                )
+            if parquet_output is not None:
+                parquet_output.finish()
+        finally:
+            if parquet_output is not None:
+                parquet_output.close()
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "input": str(input_path),
+            "output": str(output_path),
+            "commits": total,
+            "green_commits": green_total,
+            "seconds": round(elapsed, 3),
+            "commits_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+            "workers": self.workers,
+        }
+        colored_print(
+            f"Classified {total:,} commits in {elapsed:.1f}s "
+            f"({stats['commits_per_second']:,.0f} commits/sec) -> {output_path}",
+            "green",
+        )
+        return stats
@@ -12,6 +12,7 @@ from greenmining.analyzers import (
     StatisticalAnalyzer,
     TemporalAnalyzer,
 )
+from greenmining.gsf_patterns import PATTERN_DETAILS_BY_NAME
 from greenmining.models.repository import Repository
 from greenmining.utils import (
     colored_print,
@@ -170,9 +171,12 @@ class DataAggregator:
         for pattern_name, data in sorted(
             pattern_data.items(), key=lambda x: x[1]["count"], reverse=True
         ):
+            detail = PATTERN_DETAILS_BY_NAME.get(pattern_name, {})
             patterns_list.append(
                 {
                     "pattern_name": pattern_name,
+                    "category": detail.get("category"),
+                    "sci_impact": detail.get("sci_impact"),
                     "count": data["count"],
                     "percentage": (
                         round(data["count"] / total_patterns * 100, 1) if total_patterns > 0 else 0
@@ -14,8 +14,8 @@ from greenmining.analyzers import (
 from greenmining.gsf_patterns import (
     GREEN_KEYWORDS,
     GSF_PATTERNS,
-    get_pattern_by_keywords,
-    is_green_aware,
+    get_pattern_details,
+    match_message,
 )
 from greenmining.utils import (
     colored_print,
@@ -31,6 +31,8 @@ class DataAnalyzer:
         self,
         batch_size: int = 10,
         enable_diff_analysis: bool = False,
+        keyword_matching: str = "substring",
+        keyword_evidence: bool = False,
     ):
         # Initialize analyzer with GSF patterns.
         # Use GSF patterns from gsf_patterns.py
@@ -38,6 +40,10 @@ class DataAnalyzer:
         self.green_keywords = GREEN_KEYWORDS
         self.batch_size = batch_size
         self.enable_diff_analysis = enable_diff_analysis
+        # "substring" (default) or "token" (word-boundary aware) keyword matching
+        self.keyword_matching = keyword_matching
+        # Record (keyword, start, end) spans of every match for evidence highlighting
+        self.keyword_evidence = keyword_evidence
 
         # Initialize code diff analyzer if enabled
         if self.enable_diff_analysis:
@@ -68,18 +74,17 @@ class DataAnalyzer:
                         "yellow",
                     )
                     pbar.update(1)
-
         return results
 
     def _analyze_commit(self, commit: dict[str, Any]) -> dict[str, Any]:
         # Analyze a single commit using GSF patterns.
         message = commit.get("message", "")
 
-        # Q1: GREEN AWARENESS - Check using GSF keywords
-        green_aware = is_green_aware(message)
-
-        # Q2: KNOWN GSF PATTERNS - Match against Green Software Foundation patterns
-        matched_patterns = get_pattern_by_keywords(message)
+        # Q1 + Q2: GREEN AWARENESS and KNOWN GSF PATTERNS from a single keyword scan
+        match = match_message(message, self.keyword_matching, with_spans=self.keyword_evidence)
+        green_aware = match.green_aware
+        matched_patterns = match.pattern_names
+        pattern_ids = match.pattern_ids
 
         # Q3: CODE DIFF ANALYSIS (if enabled and diff data available)
         diff_analysis = None
@@ -103,19 +108,6 @@ class DataAnalyzer:
                     "confidence": "none",
                 }
 
-        # Get detailed pattern info
-        pattern_details = []
-        for _pattern_id, pattern in self.gsf_patterns.items():
-            if pattern["name"] in matched_patterns:
-                pattern_details.append(
-                    {
-                        "name": pattern["name"],
-                        "category": pattern["category"],
-                        "description": pattern["description"],
-                        "sci_impact": pattern["sci_impact"],
-                    }
-                )
-
         # Calculate confidence based on number of patterns matched
         # Boost confidence if diff analysis also detected patterns
         pattern_count = len(matched_patterns)
@@ -133,9 +125,10 @@ class DataAnalyzer:
             # Research Question 1: Green awareness
             "green_aware": green_aware,
             # Research Question 2: Known GSF patterns
+            # Pattern details are resolved from the shared index at export time
+            "gsf_pattern_ids": pattern_ids,
             "gsf_patterns_matched": matched_patterns,
             "pattern_count": len(matched_patterns),
-            "pattern_details": pattern_details,
             "confidence": confidence,
             # Additional metadata
             "files_modified": commit.get("files_changed", commit.get("modified_files", [])),
@@ -143,12 +136,24 @@ class DataAnalyzer:
             "deletions": commit.get("lines_deleted", commit.get("deletions", 0)),
         }
 
+        if self.keyword_evidence:
+            result["keyword_evidence"] = [
+                {"keyword": keyword, "start": start, "end": end}
+                for keyword, start, end in match.spans
+            ]
+
         # Add diff analysis results if available
         if diff_analysis:
             result["diff_analysis"] = diff_analysis
 
         return result
 
+    def _with_pattern_details(self, result: dict[str, Any]) -> dict[str, Any]:
+        # Attach full pattern details for export, resolved from pattern ids.
+        if "pattern_details" in result or "gsf_pattern_ids" not in result:
+            return result
+        return {**result, "pattern_details": get_pattern_details(result["gsf_pattern_ids"])}
+
     def save_results(self, results: list[dict[str, Any]], output_file: Path):
         # Save analysis results to JSON file.
         # Calculate summary statistics
@@ -174,7 +179,7 @@ class DataAnalyzer:
                 "analyzer_type": "keyword_heuristic",
                 "note": "This analysis uses keyword and heuristic matching. For AI-powered analysis, use Claude API.",
             },
-            "results": results,
+            "results": [self._with_pattern_details(r) for r in results],
         }
 
         save_json_file(data, output_file)
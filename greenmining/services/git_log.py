@@ -0,0 +1,212 @@
+# Lightweight commit reader over one `git log -z` subprocess (no PyDriller objects).
+
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+
+# Header fields are separated by the ASCII unit separator; -z terminates each
+# header and each --numstat entry with NUL, which a commit message cannot contain
+FIELD_SEPARATOR = "\x1f"
+LOG_FORMAT = FIELD_SEPARATOR.join(["%H", "%an", "%ae", "%aI", "%B"])
+
+READ_CHUNK_SIZE = 1 << 16
+
+
+@dataclass
+class FileStat:
+    # Line counts for one file of a commit (`git log --numstat`).
+
+    path: str
+    added: int = 0
+    deleted: int = 0
+    old_path: str | None = None  # set for renames and copies
+    binary: bool = False
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+
+@dataclass
+class LogRecord:
+    # One commit read from `git log`: metadata, message and optional numstat.
+
+    hash: str
+    author: str
+    author_email: str
+    date: datetime
+    message: str
+    files: list[FileStat] = field(default_factory=list)
+
+    @property
+    def insertions(self) -> int:
+        return sum(f.added for f in self.files)
+
+    @property
+    def deletions(self) -> int:
+        return sum(f.deleted for f in self.files)
+
+
+def _nul_tokens(stream) -> Iterator[str]:
+    # Split a binary stream on NUL without loading it whole.
+    buffer = b""
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        *tokens, buffer = buffer.split(b"\0")
+        for token in tokens:
+            yield token.decode("utf-8", "replace")
+    if buffer:
+        yield buffer.decode("utf-8", "replace")
+
+
+def parse_log_tokens(tokens: Iterable[str]) -> Iterator[LogRecord]:
+    # Parse NUL-separated `git log -z --format=LOG_FORMAT [--numstat]` output.
+    record = None
+    rename_stat = None
+    pending_paths: list[str] = []
+
+    for token in tokens:
+        if rename_stat is not None:
+            # Rename/copy entries are "added\tdeleted\t" NUL old NUL new
+            pending_paths.append(token)
+            if len(pending_paths) == 2:
+                rename_stat.old_path, rename_stat.path = pending_paths
+                record.files.append(rename_stat)
+                rename_stat = None
+                pending_paths = []
+            continue
+
+        if FIELD_SEPARATOR in token:
+            if record is not None:
+                yield record
+            commit_hash, author, email, date, message = token.lstrip("\n").split(FIELD_SEPARATOR, 4)
+            record = LogRecord(
+                hash=commit_hash,
+                author=author,
+                author_email=email,
+                date=datetime.fromisoformat(date),
+                message=message.strip(),
+            )
+            continue
+
+        if record is None:
+            continue
+        stat = token.lstrip("\n")
+        if not stat:
+            continue
+        added, deleted, path = stat.split("\t", 2)
+        binary = added == "-"
+        file_stat = FileStat(
+            path=path,
+            added=0 if binary else int(added),
+            deleted=0 if binary else int(deleted),
+            binary=binary,
+        )
+        if path:
+            record.files.append(file_stat)
+        else:
+            rename_stat = file_stat
+
+    if record is not None:
+        yield record
+
+
+def iter_git_log(
+    repo_path: str,
+    rev: str = "HEAD",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    max_count: int | None = None,
+    no_merges: bool = False,
+    reverse: bool = False,
+    numstat: bool = False,
+    extra_args: Iterable[str] = (),
+    commits: Iterable[str] | None = None,
+) -> Iterator[LogRecord]:
+    # Yield LogRecords from a single `git log -z` subprocess.
+    # Args:
+    #   repo_path: Local repository path
+    #   rev: Revision or range passed to git log
+    #   since / until: Optional author-date bounds (git log --since/--until)
+    #   max_count: Optional commit limit
+    #   no_merges: Exclude merge commits
+    #   reverse: Oldest commit first
+    #   numstat: Include per-file added/deleted line counts
+    #   extra_args: Additional git log arguments (e.g. path filters after "--")
+    #   commits: Exactly these commit hashes, in the given order, instead of walking rev
+    command = [
+        "git",
+        "-C",
+        str(repo_path),
+        "-c",
+        "core.quotePath=false",
+        "log",
+        "-z",
+        "--no-color",
+        f"--format={LOG_FORMAT}",
+    ]
+    if numstat:
+        command.append("--numstat")
+    if since:
+        command.append(f"--since={since.isoformat()}")
+    if until:
+        command.append(f"--until={until.isoformat()}")
+    if max_count:
+        command.append(f"--max-count={max_count}")
+    if no_merges:
+        command.append("--no-merges")
+    if reverse:
+        command.append("--reverse")
+    if commits is not None:
+        commits = list(commits)
+        if not commits:
+            return
+        # Hashes go through stdin so long lists never hit the argument length limit
+        command.extend(["--no-walk=unsorted", "--stdin"])
+    else:
+        command.append(rev)
+    command.extend(extra_args)
+
+    # Same subprocess handling as StreamingDiffAnalyzer.analyze_repository
+    with tempfile.TemporaryFile() as stderr, tempfile.TemporaryFile() as stdin:
+        if commits is not None:
+            stdin.write("".join(f"{commit}\n" for commit in commits).encode())
+            stdin.seek(0)
+        process = subprocess.Popen(
+            command,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            env={**os.environ, "GIT_PAGER": "cat"},
+        )
+        try:
+            yield from parse_log_tokens(_nul_tokens(process.stdout))
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            returncode = process.wait()
+            if returncode > 0:
+                stderr.seek(0)
+                message = stderr.read().decode("utf-8", "replace").strip()
+                raise RuntimeError(f"git log failed for {repo_path}: {message}")
+
+
+def numstat_index(repo_path: str, **log_args) -> dict[str, tuple[list[str], int, int]]:
+    # Per-commit (file names, insertions, deletions) for a commit range or an explicit
+    # commit list, keyed by hash, from one `git log --numstat` subprocess.
+    # Args:
+    #   repo_path: Local repository path
+    #   log_args: iter_git_log filters (rev, since, until, max_count, no_merges, commits, ...)
+    return {
+        record.hash: ([f.filename for f in record.files], record.insertions, record.deletions)
+        for record in iter_git_log(repo_path, numstat=True, **log_args)
+    }
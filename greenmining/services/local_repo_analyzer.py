@@ -2,28 +2,105 @@
 
 from __future__ import annotations
 
+import multiprocessing
 import os
 import re
 import shutil
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, field
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
 from typing import Any
 
-from pydriller import Repository
-from pydriller.metrics.process.change_set import ChangeSet
-from pydriller.metrics.process.code_churn import CodeChurn
-from pydriller.metrics.process.commits_count import CommitsCount
-from pydriller.metrics.process.contributors_count import ContributorsCount
-from pydriller.metrics.process.contributors_experience import ContributorsExperience
-from pydriller.metrics.process.history_complexity import HistoryComplexity
-from pydriller.metrics.process.hunks_count import HunksCount
-from pydriller.metrics.process.lines_count import LinesCount
-
-from greenmining.gsf_patterns import GSF_PATTERNS, get_pattern_by_keywords, is_green_aware
+from pydriller import Git, Repository
+
+from greenmining.analyzers.code_diff_analyzer import CodeDiffAnalyzer, modified_file_path
+from greenmining.analyzers.diff_guards import CONTENT_SAMPLE_LINES, DiffGuards
+from greenmining.gsf_patterns import (
+    GREEN_KEYWORDS,
+    GSF_PATTERNS,
+    catalogue_hash,
+    get_classification_cache,
+    get_pattern_details,
+    get_pattern_names,
+    match_message,
+    set_catalogue,
+)
+from greenmining.services.analysis_state import (
+    AnalysisStateStore,
+    RepositoryState,
+    settings_fingerprint,
+)
+from greenmining.services.git_log import LogRecord, iter_git_log, numstat_index
+from greenmining.services.mirror_cache import MirrorCache, credential_config
+from greenmining.services.process_metrics import ProcessMetricsEngine
 from greenmining.utils import colored_print
 
+# Per-commit feature tiers, cheapest first. Each tier gates the PyDriller
+# properties it reads: stats -> modified_files line counts, diff -> diff_parsed,
+# structural -> Lizard nloc/complexity, dmm -> dmm_*, methods -> Lizard methods,
+# source -> source_code/source_code_before.
+FEATURE_TIERS = ("message", "stats", "diff", "structural", "dmm", "methods", "source")
+
+# Tiers the `git log` fast path can compute without PyDriller
+LOG_FEATURES = frozenset({"message", "stats"})
+
+# Tiers whose file lists go through the huge-diff path guards
+GUARDED_FEATURES = frozenset({"diff", "structural", "methods"})
+
+# Tiers that run Lizard, whose files also go through the content and line budget guards
+LIZARD_FEATURES = frozenset({"structural", "methods"})
+
+# Partial clone filters (`git clone --filter`): blob:none fetches file contents on
+# demand, tree:0 fetches commits only
+CLONE_FILTERS = ("blob:none", "tree:0")
+
+# Shallow clones are deepened at most this many times, doubling the step each time
+MAX_DEEPEN_STEPS = 16
+
+GIT_TIMEOUT = 300
+
+# Pools for analyze_repositories: threads share one analyzer; processes each build
+# their own once and escape the GIL for PyDriller, Lizard and keyword matching
+EXECUTORS = ("thread", "process")
+
+# Chunks per worker when one repository's commits are split (see commit_workers);
+# several smaller chunks even out commits of very different cost
+CHUNKS_PER_WORKER = 4
+
+# Analyzer of a process-pool worker (see _init_repository_worker)
+_worker_analyzer: LocalRepoAnalyzer | None = None
+
+# Repository of a commit-chunk worker (see _init_chunk_worker)
+_worker_git: Git | None = None
+
+
+def resolve_features(features) -> tuple[str, ...]:
+    # Validate a feature selection and add implied tiers, in FEATURE_TIERS order.
+    # message is always computed; diff analysis needs the stats tier's line counts.
+    selected = set(features) | {"message"}
+    unknown = selected.difference(FEATURE_TIERS)
+    if unknown:
+        raise ValueError(
+            f"Unknown feature tier(s): {', '.join(sorted(unknown))} "
+            f"(expected {', '.join(FEATURE_TIERS)})"
+        )
+    if "diff" in selected:
+        selected.add("stats")
+    return tuple(tier for tier in FEATURE_TIERS if tier in selected)
+
+
+def clone_filter_for(features, process_metrics: bool = False) -> str:
+    # Narrowest partial clone filter serving a feature selection. Commit messages
+    # need no trees; line counts, diffs, Lizard, DMM, source capture and process
+    # metrics all read the blobs of changed files, which are fetched on demand.
+    if process_metrics or set(resolve_features(features)) != {"message"}:
+        return "blob:none"
+    return "tree:0"
+
 
 @dataclass
 class MethodMetrics:
@@ -87,9 +164,8 @@ class CommitAnalysis:
     author_email: str
     date: datetime
     green_aware: bool
-    gsf_patterns_matched: list[str]
+    pattern_ids: tuple[str, ...]
     pattern_count: int
-    pattern_details: list[dict[str, Any]]
     confidence: str
     files_modified: list[str]
     insertions: int
@@ -116,6 +192,24 @@ class CommitAnalysis:
     energy_joules: float | None = None
     energy_watts_avg: float | None = None
 
+    # Code diff analysis (populated when diff_analysis=True)
+    diff_patterns: list[str] = field(default_factory=list)
+    diff_confidence: str | None = None
+    diff_evidence: dict[str, list[str]] = field(default_factory=dict)
+
+    # Files skipped or sampled by the huge-diff guards ({"path", "reason", ...})
+    skipped_files: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def gsf_patterns_matched(self) -> list[str]:
+        # Matched GSF pattern names, resolved from the shared pattern index.
+        return get_pattern_names(self.pattern_ids)
+
+    @property
+    def pattern_details(self) -> list[dict[str, Any]]:
+        # Matched GSF pattern details, resolved from the shared pattern index.
+        return get_pattern_details(self.pattern_ids)
+
     def to_dict(self) -> dict[str, Any]:
         # Convert to dictionary.
         result = {
@@ -125,6 +219,7 @@ class CommitAnalysis:
             "author_email": self.author_email,
             "date": self.date.isoformat() if self.date else None,
             "green_aware": self.green_aware,
+            "gsf_pattern_ids": list(self.pattern_ids),
             "gsf_patterns_matched": self.gsf_patterns_matched,
             "pattern_count": self.pattern_count,
             "pattern_details": self.pattern_details,
@@ -151,6 +246,14 @@ class CommitAnalysis:
             result["energy_joules"] = self.energy_joules
             result["energy_watts_avg"] = self.energy_watts_avg
 
+        if self.diff_confidence is not None:
+            result["diff_patterns"] = self.diff_patterns
+            result["diff_confidence"] = self.diff_confidence
+            result["diff_evidence"] = self.diff_evidence
+
+        if self.skipped_files:
+            result["skipped_files"] = self.skipped_files
+
         return result
 
 
@@ -166,6 +269,8 @@ class RepositoryAnalysis:
     commits: list[CommitAnalysis] = field(default_factory=list)
     process_metrics: dict[str, Any] = field(default_factory=dict)
     energy_metrics: dict[str, Any] | None = None
+    # Feature tiers computed for every commit (see FEATURE_TIERS)
+    features: list[str] = field(default_factory=list)
 
     def to_dict(self) -> dict[str, Any]:
         # Convert to dictionary.
@@ -178,11 +283,65 @@ class RepositoryAnalysis:
             "commits": [c.to_dict() for c in self.commits],
             "process_metrics": self.process_metrics,
         }
+        if self.features:
+            result["features"] = self.features
         if self.energy_metrics:
             result["energy_metrics"] = self.energy_metrics
         return result
 
 
+def _can_start_pool() -> bool:
+    # Whether this thread may start a process pool: forking from a worker thread, or
+    # nesting pools inside a pool worker, is unsafe.
+    return _worker_analyzer is None and threading.current_thread() is threading.main_thread()
+
+
+def _init_repository_worker(
+    analyzer: LocalRepoAnalyzer,
+    catalogue: str,
+    patterns: dict[str, dict],
+    green_keywords: list[str],
+):
+    # Process-pool initializer: keep one analyzer per worker, on the parent's catalogue.
+    global _worker_analyzer
+    if catalogue_hash() != catalogue:
+        # Spawned workers start from the built-in catalogue
+        set_catalogue(patterns, green_keywords)
+    if analyzer.mirror_cache:
+        # Pins are per process, so only the parent evicts against the budget
+        analyzer.mirror_cache.disk_budget = None
+    _worker_analyzer = analyzer
+
+
+def _analyze_in_worker(url: str) -> RepositoryAnalysis:
+    # Worker task: analyze one repository; the result is pickled back to the parent.
+    return _worker_analyzer.analyze_repository(url)
+
+
+def _init_chunk_worker(
+    analyzer: LocalRepoAnalyzer,
+    catalogue: str,
+    patterns: dict[str, dict],
+    green_keywords: list[str],
+    repo_path: str,
+    open_lock,
+):
+    # Process-pool initializer for commit chunks: also open the shared clone once.
+    # PyDriller writes .git/config when opening a repository, so workers take turns.
+    global _worker_git
+    _init_repository_worker(analyzer, catalogue, patterns, green_keywords)
+    with open_lock:
+        _worker_git = Git(repo_path)
+
+
+def _analyze_chunk(
+    hashes: list[str],
+    stats_index: dict[str, tuple[list[str], int, int]] | None,
+) -> list[CommitAnalysis]:
+    # Worker task: analyze one contiguous chunk of a repository's commits.
+    return _worker_analyzer._analyze_commits(_worker_git, hashes, stats_index)
+
+
 class LocalRepoAnalyzer:
     # Analyze repositories directly from GitHub URLs using PyDriller.
     # Supports HTTPS URLs, SSH URLs, and private repositories.
@@ -207,6 +366,21 @@ class LocalRepoAnalyzer:
         commit_order: str = "newest_first",
         shallow_clone: bool = True,
         clone_depth: int | None = None,
+        keyword_matching: str = "substring",
+        diff_analysis: bool = False,
+        diff_guards: DiffGuards | None = None,
+        analysis_level: str = "full",
+        message_stats: bool = True,
+        features: list[str] | None = None,
+        process_metrics_since: datetime | None = None,
+        process_metrics_to: datetime | None = None,
+        mirror_cache: bool = False,
+        cache_budget_mb: int | None = None,
+        full_history: bool = False,
+        clone_filter: str | None = "auto",
+        incremental: bool = False,
+        state_dir: Path | None = None,
+        commit_workers: int = 1,
     ):
         # Initialize the local repository analyzer.
         # Args:
@@ -224,8 +398,67 @@ class LocalRepoAnalyzer:
         #   include_source_code: Include source code before/after in results
         #   process_metrics: "standard" or "full" PyDriller process metrics
         #   commit_order: "newest_first" (default) or "oldest_first"
-        #   shallow_clone: Use shallow cloning to reduce download size (default True)
-        #   clone_depth: Git clone depth (auto-calculated from max_commits if None)
+        #   shallow_clone: Fetch only the history the analysis needs (default True)
+        #   clone_depth: Initial clone depth for newest-first traversals (default
+        #                max_commits + 1); deepened until max_commits commits qualify
+        #   keyword_matching: "substring" (default) or "token" (word-boundary aware)
+        #   diff_analysis: Run CodeDiffAnalyzer on each commit's modified files
+        #   diff_guards: Skip/budget rules for generated, vendored, minified and huge
+        #                files in diff analysis and Lizard metrics (default: DiffGuards())
+        #   analysis_level: "full" (PyDriller traversal, default) or "message" (one
+        #                   `git log -z` stream: message heuristics and line counts only)
+        #   message_stats: In "message" mode, add --numstat file and line counts
+        #   features: Explicit per-commit feature tiers (see FEATURE_TIERS); overrides
+        #             analysis_level and the diff/method/source flags. Selections within
+        #             message and stats use the `git log` fast path.
+        #   process_metrics_since / process_metrics_to: Explicit process metrics window;
+        #             by default process metrics cover exactly the analyzed commits
+        #   mirror_cache: Keep bare mirrors under clone_path/mirrors, updated with
+        #                 `git fetch` on reuse (replaces clone + cleanup_after)
+        #   cache_budget_mb: Disk budget for the mirror cache; least recently used
+        #                    mirrors are evicted beyond it (None = unlimited)
+        #   full_history: Fetch the complete history (e.g. for process metrics over
+        #                 the whole project) instead of deepening adaptively
+        #   clone_filter: Partial clone filter: "auto" (default, from features and
+        #                 process metrics via clone_filter_for), "blob:none", "tree:0"
+        #                 or None for full-object clones
+        #   incremental: Keep each repository's analysis, and on later runs analyze only
+        #                the commits of the current window and max_commits it lacks;
+        #                settings or pattern changes trigger a full recompute
+        #   state_dir: Directory of the incremental state (default clone_path/state)
+        #   commit_workers: Worker processes per repository; the `git rev-list` commit
+        #                   list is split into contiguous chunks whose commits workers
+        #                   look up by hash, merged in commit order (same result as
+        #                   serial). Only used from the main thread of the main
+        #                   process: under analyze_repositories' pools the
+        #                   repositories are the unit of parallelism
+        if analysis_level not in ("full", "message"):
+            raise ValueError(f"analysis_level must be 'full' or 'message', got {analysis_level!r}")
+        if features is None:
+            if analysis_level == "message":
+                if diff_analysis or method_level_analysis or include_source_code:
+                    colored_print(
+                        "   Warning: analysis_level='message' ignores diff, method and "
+                        "source analysis",
+                        "yellow",
+                    )
+                features = ["stats"] if message_stats else []
+            else:
+                features = ["stats", "structural", "dmm"]
+                if diff_analysis:
+                    features.append("diff")
+                if method_level_analysis:
+                    features.append("methods")
+                if include_source_code:
+                    features.append("source")
+        self.features = resolve_features(features)
+        if clone_filter == "auto":
+            clone_filter = clone_filter_for(self.features, compute_process_metrics)
+        elif clone_filter is not None and clone_filter not in CLONE_FILTERS:
+            raise ValueError(
+                f"clone_filter must be 'auto', None or one of {CLONE_FILTERS}, got {clone_filter!r}"
+            )
+        self.clone_filter = clone_filter
         self.clone_path = clone_path or Path.cwd() / "greenmining_repos"
         self.clone_path.mkdir(parents=True, exist_ok=True)
         self.max_commits = max_commits
@@ -237,10 +470,19 @@ class LocalRepoAnalyzer:
         self.cleanup_after = cleanup_after
         self.commit_order = commit_order
         self.shallow_clone = shallow_clone
-        # Auto-calculate clone depth: max_commits * 5 to account for merges/skipped commits
-        # and avoid boundary errors where parent commits fall outside the shallow window
-        self.clone_depth = clone_depth if clone_depth else max(100, max_commits * 5)
+        self.full_history = full_history
+        # One extra commit gives the oldest analyzed commit its parent; merges and
+        # commits outside the date window are made up for by deepening
+        self.clone_depth = clone_depth if clone_depth else max_commits + 1
         self.gsf_patterns = GSF_PATTERNS
+        self.mirror_cache = (
+            MirrorCache.for_root(
+                self.clone_path, cache_budget_mb * 1024 * 1024 if cache_budget_mb else None
+            )
+            if mirror_cache
+            else None
+        )
+        self.keyword_matching = keyword_matching
 
         # Phase 1.3: Private repository support
         self.ssh_key_path = ssh_key_path
@@ -254,13 +496,43 @@ class LocalRepoAnalyzer:
             self._init_energy_meter()
 
         # Phase 3.2: Method-level analysis
-        self.method_level_analysis = method_level_analysis
+        self.method_level_analysis = "methods" in self.features
 
         # Phase 3.3: Source code access
-        self.include_source_code = include_source_code
+        self.include_source_code = "source" in self.features
 
         # Phase 3.1: Full process metrics mode
         self.process_metrics_mode = process_metrics
+        self.process_metrics_since = process_metrics_since
+        self.process_metrics_to = process_metrics_to
+
+        # Code diff analysis inside the same commit traversal
+        self.diff_guards = diff_guards or DiffGuards()
+        self.diff_analyzer = CodeDiffAnalyzer(self.diff_guards) if "diff" in self.features else None
+
+        # Message-only fast path (no diffs, Lizard or DMM)
+        self.analysis_level = "message" if LOG_FEATURES.issuperset(self.features) else "full"
+        self.message_stats = "stats" in self.features
+
+        # Incremental re-analysis from stored per-repository state
+        self.state_store = (
+            AnalysisStateStore(state_dir or self.clone_path / "state") if incremental else None
+        )
+
+        # Intra-repository parallelism over chunks of the commit list
+        self.commit_workers = commit_workers
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Energy meters hold backend handles; a process-pool worker opens its own.
+        state = self.__dict__.copy()
+        state["_energy_meter"] = None
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        self.__dict__.update(state)
+        self.gsf_patterns = GSF_PATTERNS
+        if self.energy_tracking:
+            self._init_energy_meter()
 
     def _init_energy_meter(self):
         # Initialize the energy measurement backend.
@@ -304,26 +576,43 @@ class LocalRepoAnalyzer:
 
         raise ValueError(f"Could not parse GitHub URL: {url}")
 
-    def _get_pattern_details(self, matched_patterns: list[str]) -> list[dict[str, Any]]:
-        # Get detailed pattern information.
-        details = []
-        for _pattern_id, pattern in self.gsf_patterns.items():
-            if pattern["name"] in matched_patterns:
-                details.append(
-                    {
-                        "name": pattern["name"],
-                        "category": pattern["category"],
-                        "description": pattern["description"],
-                        "sci_impact": pattern["sci_impact"],
-                    }
-                )
-        return details
-
-    def _extract_method_metrics(self, commit) -> list[MethodMetrics]:
+    def _guarded_files(self, commit, lizard: bool = False) -> list[dict[str, Any]]:
+        # Modified files the guards exclude, as {"path", "reason"} records.
+        # With lizard, files Lizard would analyze are also checked by content (a
+        # generated header, minified lines) and against the per-file and per-commit
+        # line budgets; Lizard reads whole files, so over-budget files are skipped.
+        guards = self.diff_guards
+        skipped = []
+        lines_used = 0
+        for mod in commit.modified_files:
+            path = modified_file_path(mod)
+            reason = guards.path_skip_reason(path)
+            if not reason and lizard and mod.language_supported:
+                added = (mod.diff_parsed or {}).get("added") or []
+                reason = guards.content_skip_reason(added[:CONTENT_SAMPLE_LINES])
+                changed = mod.added_lines + mod.deleted_lines
+                budget = guards.file_budget(lines_used)
+                if not reason and budget is not None and changed > budget:
+                    over_file = (
+                        guards.max_lines_per_file is not None
+                        and changed > guards.max_lines_per_file
+                    )
+                    reason = "file_budget" if over_file else "commit_budget"
+                if not reason:
+                    lines_used += changed
+            if reason:
+                skipped.append({"path": path, "reason": reason})
+        return skipped
+
+    def _extract_method_metrics(
+        self, commit, guarded_paths: set[str] | None = None
+    ) -> list[MethodMetrics]:
         # Extract per-method metrics from modified files using Lizard (via PyDriller).
         methods = []
         try:
             for mod in commit.modified_files:
+                if guarded_paths and modified_file_path(mod) in guarded_paths:
+                    continue
                 if mod.methods:
                     for method in mod.methods:
                         methods.append(
@@ -362,37 +651,85 @@ class LocalRepoAnalyzer:
             pass
         return changes
 
-    def analyze_commit(self, commit) -> CommitAnalysis:
+    def analyze_commit(
+        self, commit, stats_index: dict[str, tuple[list[str], int, int]] | None = None
+    ) -> CommitAnalysis:
         # Analyze a single PyDriller commit object.
+        # Only the PyDriller properties of the selected feature tiers are read.
+        # stats_index (from numstat_index) supplies file and line counts without
+        # per-file diffs; commits missing from it fall back to modified_files.
         message = commit.msg or ""
 
-        # Green awareness check
-        green_aware = is_green_aware(message)
-
-        # GSF pattern matching
-        matched_patterns = get_pattern_by_keywords(message)
-        pattern_details = self._get_pattern_details(matched_patterns)
+        # Green awareness check and GSF pattern matching in a single scan
+        match = match_message(message, self.keyword_matching)
+        green_aware = match.green_aware
+        pattern_ids = tuple(match.pattern_ids)
 
-        # Confidence calculation
-        pattern_count = len(matched_patterns)
-        confidence = "high" if pattern_count >= 2 else "medium" if pattern_count == 1 else "low"
+        features = self.features
 
         # File modifications
-        files_modified = [mod.filename for mod in commit.modified_files]
-        insertions = sum(mod.added_lines for mod in commit.modified_files)
-        deletions = sum(mod.deleted_lines for mod in commit.modified_files)
+        files_modified = []
+        insertions = 0
+        deletions = 0
+        if "stats" in features:
+            stats = stats_index.get(commit.hash) if stats_index else None
+            if stats:
+                files_modified, insertions, deletions = stats
+            else:
+                modified_files = commit.modified_files
+                files_modified = [mod.filename for mod in modified_files]
+                insertions = sum(mod.added_lines for mod in modified_files)
+                deletions = sum(mod.deleted_lines for mod in modified_files)
+
+        # Code diff analysis on the already-loaded modified files
+        diff_result = None
+        if self.diff_analyzer:
+            try:
+                diff_result = self.diff_analyzer.analyze_modified_files(
+                    commit.modified_files,
+                    {
+                        "lines_added": insertions,
+                        "lines_removed": deletions,
+                        "files_changed": len(files_modified),
+                        "net_lines": insertions - deletions,
+                        "complexity_change": 0,
+                    },
+                    repo=getattr(commit, "project_path", ""),
+                )
+            except Exception:
+                pass  # Diff analysis may fail for some commits
+
+        # Confidence calculation (diff patterns boost the message-based score)
+        pattern_count = len(pattern_ids)
+        evidence_count = pattern_count
+        if diff_result:
+            evidence_count += len(diff_result["patterns_detected"])
+        confidence = "high" if evidence_count >= 2 else "medium" if evidence_count == 1 else "low"
 
         # Delta Maintainability Model (if available)
         dmm_unit_size = None
         dmm_unit_complexity = None
         dmm_unit_interfacing = None
 
-        try:
-            dmm_unit_size = commit.dmm_unit_size
-            dmm_unit_complexity = commit.dmm_unit_complexity
-            dmm_unit_interfacing = commit.dmm_unit_interfacing
-        except Exception:
-            pass  # DMM may not be available for all commits
+        if "dmm" in features:
+            try:
+                dmm_unit_size = commit.dmm_unit_size
+                dmm_unit_complexity = commit.dmm_unit_complexity
+                dmm_unit_interfacing = commit.dmm_unit_interfacing
+            except Exception:
+                pass  # DMM may not be available for all commits
+
+        # Huge-diff guards: generated, vendored, minified and over-budget files never
+        # reach Lizard
+        skipped_files = []
+        guarded_paths = set()
+        if GUARDED_FEATURES.intersection(features):
+            skipped_files = self._guarded_files(
+                commit, lizard=bool(LIZARD_FEATURES.intersection(features))
+            )
+            guarded_paths = {entry["path"] for entry in skipped_files}
+        if diff_result:
+            skipped_files += [e for e in diff_result["skipped"] if e["path"] not in guarded_paths]
 
         # Structural metrics from Lizard (via PyDriller)
         total_nloc = 0
@@ -400,27 +737,30 @@ class LocalRepoAnalyzer:
         max_complexity = 0
         methods_count = 0
 
-        try:
-            for mod in commit.modified_files:
-                if mod.nloc:
-                    total_nloc += mod.nloc
-                if mod.complexity:
-                    total_complexity += mod.complexity
-                    if mod.complexity > max_complexity:
-                        max_complexity = mod.complexity
-                if mod.methods:
-                    methods_count += len(mod.methods)
-        except Exception:
-            pass  # Structural metrics may fail for some files
+        if "structural" in features:
+            try:
+                for mod in commit.modified_files:
+                    if guarded_paths and modified_file_path(mod) in guarded_paths:
+                        continue
+                    if mod.nloc:
+                        total_nloc += mod.nloc
+                    if mod.complexity:
+                        total_complexity += mod.complexity
+                        if mod.complexity > max_complexity:
+                            max_complexity = mod.complexity
+                    if mod.methods:
+                        methods_count += len(mod.methods)
+            except Exception:
+                pass  # Structural metrics may fail for some files
 
         # Phase 3.2: Method-level analysis
         methods = []
-        if self.method_level_analysis:
-            methods = self._extract_method_metrics(commit)
+        if "methods" in features:
+            methods = self._extract_method_metrics(commit, guarded_paths)
 
         # Phase 3.3: Source code access
         source_changes = []
-        if self.include_source_code:
+        if "source" in features:
             source_changes = self._extract_source_changes(commit)
 
         return CommitAnalysis(
@@ -430,9 +770,8 @@ class LocalRepoAnalyzer:
             author_email=commit.author.email,
             date=commit.author_date,
             green_aware=green_aware,
-            gsf_patterns_matched=matched_patterns,
+            pattern_ids=pattern_ids,
             pattern_count=pattern_count,
-            pattern_details=pattern_details,
             confidence=confidence,
             files_modified=files_modified,
             insertions=insertions,
@@ -446,8 +785,382 @@ class LocalRepoAnalyzer:
             methods_count=methods_count,
             methods=methods,
             source_changes=source_changes,
+            diff_patterns=diff_result["patterns_detected"] if diff_result else [],
+            diff_confidence=diff_result["confidence"] if diff_result else None,
+            diff_evidence=diff_result["evidence"] if diff_result else {},
+            skipped_files=skipped_files,
+        )
+
+    def analyze_log_record(self, record: LogRecord) -> CommitAnalysis:
+        # Analyze a commit read by iter_git_log (message mode).
+        match = match_message(record.message, self.keyword_matching)
+        pattern_ids = tuple(match.pattern_ids)
+        pattern_count = len(pattern_ids)
+        confidence = "high" if pattern_count >= 2 else "medium" if pattern_count == 1 else "low"
+
+        return CommitAnalysis(
+            hash=record.hash,
+            message=record.message,
+            author=record.author,
+            author_email=record.author_email,
+            date=record.date,
+            green_aware=match.green_aware,
+            pattern_ids=pattern_ids,
+            pattern_count=pattern_count,
+            confidence=confidence,
+            files_modified=[f.filename for f in record.files],
+            insertions=record.insertions,
+            deletions=record.deletions,
+        )
+
+    def _traverse_git_log(self, repo_path: str, hashes: list[str]):
+        # Message-mode records for hashes (see _traversal_commits), in order. They are
+        # read max_commits at a time: git runs ahead of the reader, so a longer list
+        # would compute numstat (and fetch blobs) for commits that are never analyzed.
+        batch = max(self.max_commits, 1)
+        for start in range(0, len(hashes), batch):
+            yield from iter_git_log(
+                repo_path, numstat=self.message_stats, commits=hashes[start : start + batch]
+            )
+
+    def _traversal_commits(
+        self, repo_path: Path, repo_config: dict[str, Any], rev: str = "HEAD"
+    ) -> list[str]:
+        # Hashes the PyDriller traversal of repo_config visits, in its order.
+        order_args = ["--reverse"] if repo_config.get("order") is None else []
+        return self._git(
+            repo_path, ["rev-list", *self._range_args(repo_config), *order_args, rev]
+        ).split()
+
+    def _prefetch_stats(
+        self, repo_path: str, commits: list[str]
+    ) -> dict[str, tuple[list[str], int, int]] | None:
+        # Bulk numstat index for the commits the traversal analyzes.
+        try:
+            return numstat_index(repo_path, commits=commits)
+        except Exception as e:
+            colored_print(
+                f"   Warning: numstat prefetch failed, using per-file diffs: {e}", "yellow"
+            )
+            return None
+
+    def _history_start(self, since_date: datetime, repo_config: dict[str, Any]) -> datetime | None:
+        # Oldest commit date the analysis needs in full, or None when the newest
+        # max_commits qualifying commits suffice.
+        starts = []
+        if repo_config.get("order") is None:
+            # PyDriller lists oldest first, so the traversal starts at the window start
+            starts.append(since_date)
+        if self.compute_process_metrics and (self.process_metrics_since or self.process_metrics_to):
+            starts.append(
+                self.process_metrics_since or datetime.now() - timedelta(days=self.days_back)
+            )
+        return min(starts, key=lambda d: d.timestamp()) if starts else None
+
+    def _shallow_args(self, history_start: datetime | None) -> list[str]:
+        # Initial `git clone` history limit (--depth and --shallow-since cannot be combined).
+        if self.full_history or not self.shallow_clone:
+            return []
+        if history_start is not None:
+            return [f"--shallow-since={history_start.isoformat()}"]
+        return ["--depth", str(self.clone_depth)]
+
+    def _filter_args(self) -> list[str]:
+        # Partial clone arguments. Analysis reads objects, not the worktree, so
+        # nothing is checked out (a checkout would fetch every blob at HEAD).
+        if self.clone_filter is None:
+            return []
+        return [f"--filter={self.clone_filter}", "--no-checkout"]
+
+    def _git(
+        self,
+        repo_path: Path,
+        args: list[str],
+        env: dict[str, str] | None = None,
+        input: str | None = None,
+    ) -> str:
+        return subprocess.run(
+            ["git", *args],
+            cwd=str(repo_path),
+            env=env,
+            input=input,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=GIT_TIMEOUT,
+        ).stdout
+
+    def _shallow_boundary(self, repo_path: Path) -> dict[str, int]:
+        # Commit dates (unix time) of the shallow boundary; empty for full history.
+        shallow_file = (
+            repo_path / self._git(repo_path, ["rev-parse", "--git-path", "shallow"]).strip()
+        )
+        if not shallow_file.exists():
+            return {}
+        hashes = shallow_file.read_text().split()
+        if not hashes:
+            return {}
+        output = self._git(repo_path, ["show", "-s", "--format=%H %ct", *hashes])
+        return {h: int(ct) for h, ct in (line.split() for line in output.splitlines())}
+
+    def _range_args(self, repo_config: dict[str, Any]) -> list[str]:
+        # git rev-list/log filters of the traversal's commit range.
+        args = [f"--since={repo_config['since'].isoformat()}"]
+        if repo_config.get("to"):
+            args.append(f"--until={repo_config['to'].isoformat()}")
+        if repo_config["only_no_merge"]:
+            args.append("--no-merges")
+        return args
+
+    def _qualifying_commits(
+        self, repo_path: Path, repo_config: dict[str, Any], boundary: dict[str, int]
+    ) -> int:
+        # Commits the traversal would analyze whose parents are present.
+        commits = self._git(repo_path, ["rev-list", *self._range_args(repo_config), "HEAD"])
+        return sum(1 for commit in commits.split() if commit not in boundary)
+
+    def _ensure_history(
+        self,
+        repo_path: Path,
+        repo_config: dict[str, Any],
+        history_start: datetime | None,
+        git_config: list[str],
+        env: dict[str, str] | None = None,
+    ):
+        # Deepen a shallow clone until max_commits commits qualify or the history
+        # reaches history_start (the date window start when none is given).
+        # Args:
+        #   repo_path: Local clone or bare mirror
+        #   repo_config: PyDriller filters of the traversal
+        #   history_start: Oldest commit date needed in full (see _history_start)
+        #   git_config: `git -c` options for fetching from origin (credentials)
+        #   env: Environment for git (e.g. GIT_SSH_COMMAND)
+        try:
+            boundary = self._shallow_boundary(repo_path)
+            if not boundary:
+                return
+            if self.full_history or not self.shallow_clone:
+                colored_print("   Fetching full history...", "cyan")
+                self._git(repo_path, [*git_config, "fetch", "--unshallow", "origin"], env)
+                return
+
+            start = (history_start or repo_config["since"]).timestamp()
+            # After --shallow-since one more commit gives the boundary its parents
+            step = 1 if history_start else self.max_commits
+            for _ in range(MAX_DEEPEN_STEPS):
+                if all(committed < start for committed in boundary.values()):
+                    return
+                if (
+                    history_start is None
+                    and self._qualifying_commits(repo_path, repo_config, boundary)
+                    >= self.max_commits
+                ):
+                    return
+                colored_print(f"   Deepening history by {step} commits...", "cyan")
+                self._git(repo_path, [*git_config, "fetch", f"--deepen={step}", "origin"], env)
+                step *= 2
+                boundary = self._shallow_boundary(repo_path)
+                if not boundary:
+                    return
+            colored_print(
+                "   Warning: History still shallow after deepening, some commits may be missing",
+                "yellow",
+            )
+        except subprocess.TimeoutExpired:
+            colored_print(
+                "   Warning: History fetch timed out, some metrics may be incomplete", "yellow"
+            )
+        except subprocess.CalledProcessError as e:
+            colored_print(f"   Warning: History fetch failed: {e.stderr}", "yellow")
+
+    def _prefetch_blobs(
+        self,
+        repo_path: Path,
+        repo_config: dict[str, Any],
+        git_config: list[str],
+        commits: list[str],
+        env: dict[str, str] | None = None,
+    ):
+        # Fetch the blobs changed in the analyzed commits (and the process metrics
+        # window) in one request; a partial clone would otherwise fetch each blob
+        # lazily while PyDriller and git log read it.
+        try:
+            promisor = self._git(repo_path, ["config", "--bool", "remote.origin.promisor"])
+        except subprocess.CalledProcessError:
+            return  # not a partial clone
+        if promisor.strip() != "true":
+            return
+
+        try:
+            walks = []
+            if commits:
+                walks.append((["--no-walk=unsorted", "--stdin"], "\n".join(commits) + "\n"))
+            if self.compute_process_metrics and (
+                self.process_metrics_since or self.process_metrics_to
+            ):
+                since = self.process_metrics_since or datetime.now() - timedelta(
+                    days=self.days_back
+                )
+                to = self.process_metrics_to or datetime.now()
+                walks.append(([f"--since={since.isoformat()}", f"--until={to.isoformat()}"], None))
+
+            blobs = set()
+            for walk_args, stdin in walks:
+                # --no-renames: rename detection would itself read the blobs
+                raw = self._git(
+                    repo_path,
+                    ["log", "--raw", "--no-abbrev", "--no-renames", "--format=", *walk_args],
+                    input=stdin,
+                )
+                for line in raw.splitlines():
+                    if not line.startswith(":"):
+                        continue
+                    old_mode, new_mode, old_blob, new_blob = line[1:].split("\t", 1)[0].split()[:4]
+                    for mode, blob in ((old_mode, old_blob), (new_mode, new_blob)):
+                        if mode != "160000" and blob.strip("0"):
+                            blobs.add(blob)
+            present = self._git(
+                repo_path, ["cat-file", "--batch-all-objects", "--batch-check=%(objectname)"]
+            )
+            missing = sorted(blobs.difference(present.split()))
+            if not missing:
+                return
+            colored_print(f"   Fetching {len(missing)} changed file versions...", "cyan")
+            # The same request git makes for a lazy fetch, batched
+            self._git(
+                repo_path,
+                [
+                    *git_config,
+                    "-c",
+                    "fetch.negotiationAlgorithm=noop",
+                    "fetch",
+                    "origin",
+                    "--no-tags",
+                    "--no-write-fetch-head",
+                    "--recurse-submodules=no",
+                    "--filter=blob:none",
+                    "--stdin",
+                ],
+                env,
+                input="".join(f"{blob}\n" for blob in missing),
+            )
+        except subprocess.TimeoutExpired:
+            colored_print("   Warning: Blob prefetch timed out, fetching on demand", "yellow")
+        except subprocess.CalledProcessError as e:
+            colored_print(
+                f"   Warning: Blob prefetch failed, fetching on demand: {e.stderr}", "yellow"
+            )
+
+    def _settings_fingerprint(self) -> str:
+        # Fingerprint of every setting that shapes the stored results.
+        return settings_fingerprint(
+            {
+                "features": list(self.features),
+                "keyword_matching": self.keyword_matching,
+                "max_commits": self.max_commits,
+                "days_back": self.days_back,
+                "since_date": self.since_date,
+                "to_date": self.to_date,
+                "skip_merges": self.skip_merges,
+                "commit_order": self.commit_order,
+                "diff_guards": asdict(self.diff_guards),
+                "compute_process_metrics": self.compute_process_metrics,
+                "process_metrics_since": self.process_metrics_since,
+                "process_metrics_to": self.process_metrics_to,
+            }
         )
 
+    def _fetch_commits(
+        self,
+        repo_path: Path,
+        commits: list[str],
+        git_config: list[str],
+        env: dict[str, str] | None = None,
+    ) -> bool:
+        # Deepen a shallow clone until HEAD reaches all of commits. False when
+        # some are missing from the full history (e.g. after a force push).
+        step = self.max_commits
+        for _ in range(MAX_DEEPEN_STEPS):
+            # rev-list only walks local commits, so it never triggers a lazy fetch
+            reachable = set(self._git(repo_path, ["rev-list", "HEAD"]).split())
+            if reachable.issuperset(commits):
+                return True
+            if not self._shallow_boundary(repo_path):
+                return False
+            colored_print(f"   Deepening history by {step} commits...", "cyan")
+            self._git(repo_path, [*git_config, "fetch", f"--deepen={step}", "origin"], env)
+            step *= 2
+        return False
+
+    def _load_state(
+        self,
+        url: str,
+        repo_path: Path,
+        git_config: list[str],
+        env: dict[str, str] | None = None,
+    ) -> RepositoryState | None:
+        # Stored state to continue from, or None for a full analysis.
+        state = self.state_store.load(url)
+        if state is None:
+            return None
+        if not state.matches(self._settings_fingerprint(), catalogue_hash()):
+            colored_print("   Settings or patterns changed, analyzing from scratch", "yellow")
+            return None
+        needed = [state.last_commit]
+        if self.compute_process_metrics and not (
+            self.process_metrics_since or self.process_metrics_to
+        ):
+            # Process metrics are recomputed over all stored commits
+            needed += [c.hash for c in state.analysis.commits]
+        try:
+            if self._fetch_commits(repo_path, needed, git_config, env):
+                return state
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            pass
+        colored_print("   Stored commits not in history, analyzing from scratch", "yellow")
+        return None
+
+    def _clone_with_fallback(self, clone, clone_args: list[str]):
+        # Run clone(clone_args). git refuses a --shallow-since window without
+        # commits; the tip alone then shows the window is empty.
+        try:
+            return clone(clone_args)
+        except subprocess.CalledProcessError:
+            if not any(arg.startswith("--shallow-since=") for arg in clone_args):
+                raise
+            return clone(
+                ["--depth", "1", *(a for a in clone_args if not a.startswith("--shallow-since="))]
+            )
+
+    def _clone_repository(self, auth_url: str, local_path: Path, clone_args: list[str]):
+        # Clone into local_path unless a clone already exists there.
+        if local_path.exists():
+            colored_print(f"   Using existing clone: {local_path}", "cyan")
+            return
+
+        colored_print(
+            f"   Cloning to: {local_path} ({' '.join(clone_args) or 'full clone'})", "cyan"
+        )
+
+        def clone(args: list[str]):
+            shutil.rmtree(local_path, ignore_errors=True)
+            subprocess.run(
+                ["git", "clone", *args, auth_url, str(local_path)],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=GIT_TIMEOUT,
+            )
+
+        try:
+            self._clone_with_fallback(clone, clone_args)
+        except subprocess.TimeoutExpired:
+            colored_print(f"   Clone timeout after {GIT_TIMEOUT}s", "yellow")
+            raise
+        except subprocess.CalledProcessError as e:
+            colored_print(f"   Clone failed: {e.stderr}", "red")
+            raise
+
     def analyze_repository(self, url: str) -> RepositoryAnalysis:
         # Analyze a repository from its URL.
         owner, repo_name = self._parse_repo_url(url)
@@ -472,69 +1185,56 @@ class LocalRepoAnalyzer:
         if self.commit_order == "oldest_first":
             repo_config["order"] = "reverse"
 
-        # Use owner_repo format for unique directory names (avoids collisions
-        # when multiple repos share the same name, e.g. open-android/Android
-        # vs hmkcode/Android vs duckduckgo/Android).
-        safe_name = re.sub(r"[^a-z0-9_-]", "_", f"{owner}_{repo_name}".lower())
-        clone_parent = self.clone_path / safe_name
-        clone_parent.mkdir(parents=True, exist_ok=True)
-        local_path = clone_parent / repo_name
-
-        # Perform shallow clone manually, then unshallow for full history
-        if not local_path.exists():
-            import subprocess
-
-            clone_cmd = ["git", "clone"]
-            if self.shallow_clone:
-                clone_cmd.extend(["--depth", str(self.clone_depth)])
-            clone_cmd.extend([auth_url, str(local_path)])
-
-            colored_print(
-                f"   Cloning to: {local_path} (depth={self.clone_depth if self.shallow_clone else 'full'})",
-                "cyan",
+        # Only the history the analysis needs is fetched: the date window for an
+        # oldest-first traversal, otherwise enough commits for max_commits; partial
+        # clones leave out the objects the selected features never read
+        history_start = self._history_start(since_date, repo_config)
+        clone_args = self._shallow_args(history_start) + self._filter_args()
+        env = self._setup_ssh_env()
+        if self.mirror_cache:
+            # Bare mirror reused across runs and fetched incrementally; the
+            # analysis reads it directly, without a worktree
+            clone_parent = None
+            local_path = self._clone_with_fallback(
+                lambda args: self.mirror_cache.acquire(
+                    url, auth_url=auth_url, env=env, clone_args=tuple(args)
+                ),
+                clone_args,
             )
-
-            try:
-                subprocess.run(
-                    clone_cmd,
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                    timeout=300,
-                )
-            except subprocess.TimeoutExpired:
-                colored_print("   Clone timeout after 300s", "yellow")
-                raise
-            except subprocess.CalledProcessError as e:
-                colored_print(f"   Clone failed: {e.stderr}", "red")
-                raise
-
-            # Immediately unshallow to get full history for accurate analysis
-            # This is still faster than a full clone: shallow clone negotiates
-            # objects quickly, then unshallow fetches the remainder incrementally
-            if self.shallow_clone:
-                colored_print("   Fetching full history...", "cyan")
-                try:
-                    subprocess.run(
-                        ["git", "fetch", "--unshallow"],
-                        cwd=str(local_path),
-                        capture_output=True,
-                        text=True,
-                        check=True,
-                        timeout=300,
-                    )
-                except subprocess.CalledProcessError:
-                    pass  # Already unshallowed or not shallow
-                except subprocess.TimeoutExpired:
-                    colored_print(
-                        "   Warning: Full history fetch timed out, some metrics may be incomplete",
-                        "yellow",
-                    )
+            git_config = credential_config(url, auth_url)
         else:
-            colored_print(f"   Using existing clone: {local_path}", "cyan")
+            # Use owner_repo format for unique directory names (avoids collisions
+            # when multiple repos share the same name, e.g. open-android/Android
+            # vs hmkcode/Android vs duckduckgo/Android).
+            safe_name = re.sub(r"[^a-z0-9_-]", "_", f"{owner}_{repo_name}".lower())
+            clone_parent = self.clone_path / safe_name
+            clone_parent.mkdir(parents=True, exist_ok=True)
+            local_path = clone_parent / repo_name
+            self._clone_repository(auth_url, local_path, clone_args)
+            git_config = []  # origin keeps auth_url
 
         # PyDriller will analyze the already-cloned repo
         repo_config["path_to_repo"] = str(local_path)
+        self._ensure_history(local_path, repo_config, history_start, git_config, env)
+
+        # The commits the traversal visits, in its order; the first max_commits are
+        # the ones analyzed unless some fail to analyze
+        traversal = self._traversal_commits(local_path, repo_config)
+        hashes = traversal
+
+        # Incremental runs analyze only the commits of the current window and
+        # max_commits that the stored state does not cover
+        state = None
+        if self.state_store:
+            state = self._load_state(url, local_path, git_config, env)
+            if state:
+                colored_print(f"   Continuing from {state.last_commit[:8]}", "cyan")
+                known = {c.hash for c in state.analysis.commits}
+                hashes = [h for h in traversal[: self.max_commits] if h not in known]
+        if set(self.features) != {"message"} or self.compute_process_metrics:
+            self._prefetch_blobs(
+                local_path, repo_config, git_config, hashes[: self.max_commits], env
+            )
 
         # Phase 2.2: Start energy measurement if enabled (fresh meter per repo)
         energy_result = None
@@ -551,27 +1251,63 @@ class LocalRepoAnalyzer:
         commits_analyzed = []
         commit_count = 0
 
-        try:
-            for commit in Repository(**repo_config).traverse_commits():
-                if commit_count >= self.max_commits:
-                    break
-
-                try:
-                    analysis = self.analyze_commit(commit)
-                    commits_analyzed.append(analysis)
-                    commit_count += 1
-
-                    if commit_count % 50 == 0:
-                        colored_print(f"   Processed {commit_count} commits...", "cyan")
+        if self.analysis_level == "message":
+            commits = self._traverse_git_log(str(local_path), hashes)
+            analyze = self.analyze_log_record
+        else:
+            if state:
+                # Only the commits the stored state lacks, as a traversal filter
+                repo_config["only_commits"] = hashes
+            if self.commit_workers > 1 and _can_start_pool():
+                commits = None
+            elif state and not hashes:
+                commits = (commit for commit in ())
+            else:
+                commits = Repository(**repo_config).traverse_commits()
+            analyze = self.analyze_commit
+            stats_index = None
+            if "stats" in self.features:
+                # One `git log --numstat` over the first max_commits commits replaces a
+                # diff per modified file for line counts
+                stats_index = self._prefetch_stats(str(local_path), hashes[: self.max_commits])
+                analyze = partial(self.analyze_commit, stats_index=stats_index)
 
-                except Exception as e:
-                    colored_print(
-                        f"   Warning: Error analyzing commit {commit.hash[:8]}: {e}", "yellow"
-                    )
-                    continue
+        try:
+            if commits is None:
+                commits_analyzed = self._analyze_chunked(str(local_path), hashes, stats_index)
+            else:
+                for commit in commits:
+                    try:
+                        analysis = analyze(commit)
+                        commits_analyzed.append(analysis)
+                        commit_count += 1
+
+                        if commit_count % 50 == 0:
+                            colored_print(f"   Processed {commit_count} commits...", "cyan")
+
+                    except Exception as e:
+                        colored_print(
+                            f"   Warning: Error analyzing commit {commit.hash[:8]}: {e}", "yellow"
+                        )
+                        continue
+                    # Stop before reading the next commit, whose diff (and, in a
+                    # partial clone, blobs) would be fetched for nothing
+                    if commit_count >= self.max_commits:
+                        break
+                # Stops the git subprocess when max_commits ends the traversal early
+                commits.close()
 
             colored_print(f"    Analyzed {len(commits_analyzed)} commits", "green")
 
+            if state:
+                # New commits join the stored ones in traversal order; stored commits
+                # that left the window or the first max_commits are dropped, as a full
+                # run would never have analyzed them
+                merged = {c.hash: c for c in state.analysis.commits}
+                merged.update((c.hash, c) for c in commits_analyzed)
+                commits_analyzed = [merged[h] for h in traversal if h in merged]
+                commits_analyzed = commits_analyzed[: self.max_commits]
+
             # Phase 2.2: Stop energy measurement
             if energy_meter:
                 try:
@@ -579,12 +1315,16 @@ class LocalRepoAnalyzer:
                 except Exception:
                     pass
 
-            # Compute process metrics if enabled (full history already available
-            # from the unshallow step that runs right after cloning)
+            # Compute process metrics if enabled, over the analyzed commits unless
+            # an explicit window is configured
             process_metrics = {}
             if self.compute_process_metrics and local_path.exists():
                 colored_print("   Computing process metrics...", "cyan")
-                process_metrics = self._compute_process_metrics(str(local_path))
+                commit_hashes = [c.hash for c in commits_analyzed]
+                if repo_config.get("order") is None:
+                    # The traversal ran oldest first; process metrics walk newest first
+                    commit_hashes.reverse()
+                process_metrics = self._compute_process_metrics(str(local_path), commit_hashes)
 
             # Calculate summary
             green_commits = sum(1 for c in commits_analyzed if c.green_aware)
@@ -604,96 +1344,152 @@ class LocalRepoAnalyzer:
                 commits=commits_analyzed,
                 process_metrics=process_metrics,
                 energy_metrics=energy_dict,
+                features=list(self.features),
             )
 
+            if self.state_store:
+                self.state_store.save(
+                    RepositoryState(
+                        url=url,
+                        last_commit=self._git(local_path, ["rev-parse", "HEAD"]).strip(),
+                        settings_fingerprint=self._settings_fingerprint(),
+                        catalogue_hash=catalogue_hash(),
+                        analysis=result,
+                    )
+                )
+
             return result
 
         finally:
+            if self.diff_analyzer:
+                # Manifest verdicts are per repository
+                self.diff_analyzer.manifests.forget(str(local_path))
+
+            if self.mirror_cache:
+                # Mirrors persist; the cache evicts them against its disk budget
+                self.mirror_cache.release(local_path)
             # Cleanup if requested (remove the unique parent dir to avoid
             # accumulating empty owner_repo directories)
-            if self.cleanup_after and clone_parent.exists():
+            elif self.cleanup_after and clone_parent.exists():
                 colored_print(f"   Cleaning up: {clone_parent}", "cyan")
                 shutil.rmtree(clone_parent, ignore_errors=True)
 
-    def _compute_process_metrics(self, repo_path: str) -> dict[str, Any]:
-        # Compute PyDriller process metrics for the repository.
-        metrics = {}
-        since_date = datetime.now() - timedelta(days=self.days_back)
-        to_date = datetime.now()
-
-        try:
-            # ChangeSet metrics
-            cs = ChangeSet(repo_path, since=since_date, to=to_date)
-            metrics["change_set_max"] = cs.max()
-            metrics["change_set_avg"] = cs.avg()
-        except Exception as e:
-            colored_print(f"   Warning: ChangeSet metrics failed: {e}", "yellow")
-
-        try:
-            # CodeChurn metrics
-            churn = CodeChurn(repo_path, since=since_date, to=to_date)
-            metrics["code_churn"] = churn.count()
-        except Exception as e:
-            colored_print(f"   Warning: CodeChurn metrics failed: {e}", "yellow")
-
-        try:
-            # CommitsCount metrics
-            cc = CommitsCount(repo_path, since=since_date, to=to_date)
-            metrics["commits_per_file"] = cc.count()
-        except Exception as e:
-            colored_print(f"   Warning: CommitsCount metrics failed: {e}", "yellow")
-
-        try:
-            # ContributorsCount metrics
-            contrib = ContributorsCount(repo_path, since=since_date, to=to_date)
-            metrics["contributors_per_file"] = contrib.count()
-        except Exception as e:
-            colored_print(f"   Warning: ContributorsCount metrics failed: {e}", "yellow")
-
-        try:
-            # ContributorsExperience metrics
-            exp = ContributorsExperience(repo_path, since=since_date, to=to_date)
-            metrics["contributors_experience"] = exp.count()
-        except Exception as e:
-            colored_print(f"   Warning: ContributorsExperience metrics failed: {e}", "yellow")
+    def _analyze_commits(
+        self,
+        git: Git,
+        hashes: list[str],
+        stats_index: dict[str, tuple[list[str], int, int]] | None = None,
+    ) -> list[CommitAnalysis]:
+        # Analyze exactly the given commits of a cloned repository, in the given order.
+        # Commits are looked up by hash, so no worker walks the history; commits
+        # that fail to analyze are reported and left out.
+        analyses = []
+        for commit_hash in hashes:
+            try:
+                commit = git.get_commit(commit_hash)
+                analyses.append(self.analyze_commit(commit, stats_index=stats_index))
+            except Exception as e:
+                colored_print(
+                    f"   Warning: Error analyzing commit {commit_hash[:8]}: {e}", "yellow"
+                )
+        return analyses
 
-        try:
-            # HistoryComplexity metrics
-            hc = HistoryComplexity(repo_path, since=since_date, to=to_date)
-            metrics["history_complexity"] = hc.count()
-        except Exception as e:
-            colored_print(f"   Warning: HistoryComplexity metrics failed: {e}", "yellow")
+    def _analyze_chunked(
+        self,
+        repo_path: str,
+        hashes: list[str],
+        stats_index: dict[str, tuple[list[str], int, int]] | None,
+    ) -> list[CommitAnalysis]:
+        # Split hashes (the traversal's rev-list, in order) into contiguous chunks,
+        # analyze them on worker processes against the shared clone and merge them
+        # in commit order. As in the serial traversal, the first max_commits commits
+        # that analyze cleanly are kept, so failures are made up for from the
+        # remaining commits.
+        results: list[CommitAnalysis] = []
+        pending = hashes
+        with ProcessPoolExecutor(
+            max_workers=self.commit_workers,
+            initializer=_init_chunk_worker,
+            initargs=(
+                self,
+                catalogue_hash(),
+                GSF_PATTERNS,
+                GREEN_KEYWORDS,
+                repo_path,
+                multiprocessing.Lock(),
+            ),
+        ) as pool:
+            while pending and len(results) < self.max_commits:
+                batch = pending[: self.max_commits - len(results)]
+                pending = pending[len(batch) :]
+                size = -(-len(batch) // (self.commit_workers * CHUNKS_PER_WORKER))
+                futures = []
+                for start in range(0, len(batch), size):
+                    chunk = batch[start : start + size]
+                    chunk_stats = (
+                        {h: stats_index[h] for h in chunk if h in stats_index}
+                        if stats_index is not None
+                        else None
+                    )
+                    futures.append(pool.submit(_analyze_chunk, chunk, chunk_stats))
+                for future in futures:
+                    results.extend(future.result())
+                    colored_print(f"   Processed {len(results)} commits...", "cyan")
+        return results
 
-        try:
-            # HunksCount metrics
-            hunks = HunksCount(repo_path, since=since_date, to=to_date)
-            metrics["hunks_count"] = hunks.count()
-        except Exception as e:
-            colored_print(f"   Warning: HunksCount metrics failed: {e}", "yellow")
+    def _compute_process_metrics(
+        self, repo_path: str, commit_hashes: list[str] | None = None
+    ) -> dict[str, Any]:
+        # Compute the eight PyDriller process metrics in one history walk.
+        # With an explicit window (process_metrics_since/_to) or no commit list,
+        # the walk covers a date window; otherwise exactly commit_hashes.
+        window = {}
+        if commit_hashes is None or self.process_metrics_since or self.process_metrics_to:
+            window = {
+                "since": self.process_metrics_since
+                or datetime.now() - timedelta(days=self.days_back),
+                "to": self.process_metrics_to or datetime.now(),
+            }
+            commit_hashes = None
 
         try:
-            # LinesCount metrics
-            lines = LinesCount(repo_path, since=since_date, to=to_date)
-            metrics["lines_count"] = lines.count()
+            return ProcessMetricsEngine().compute(repo_path, commits=commit_hashes, **window)
         except Exception as e:
-            colored_print(f"   Warning: LinesCount metrics failed: {e}", "yellow")
-
-        return metrics
+            colored_print(f"   Warning: Process metrics failed: {e}", "yellow")
+            return {}
 
     def analyze_repositories(
         self,
         urls: list[str],
         parallel_workers: int = 1,
         output_format: str = "dict",
+        executor: str = "thread",
     ) -> list[RepositoryAnalysis]:
         # Analyze multiple repositories from URLs.
         # Args:
         #   urls: List of repository URLs to analyze
         #   parallel_workers: Number of concurrent workers (1 = sequential)
         #   output_format: Output format (dict, json, csv)
+        #   executor: "thread" (default) or "process"; worker processes each build the
+        #             analyzer once and measure energy for their own repositories
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
         if parallel_workers <= 1:
-            return self._analyze_sequential(urls)
-        return self._analyze_parallel(urls, parallel_workers)
+            results = self._analyze_sequential(urls)
+        else:
+            results = self._analyze_parallel(urls, parallel_workers, executor)
+        self._report_cache_stats()
+        return results
+
+    def _report_cache_stats(self):
+        # Print shared message-classification cache statistics.
+        stats = get_classification_cache().stats()
+        if stats["hits"] or stats["misses"]:
+            colored_print(
+                f"   Message cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.1%} hit rate, {stats['size']}/{stats['maxsize']} entries)",
+                "cyan",
+            )
 
     def _analyze_sequential(self, urls: list[str]) -> list[RepositoryAnalysis]:
         # Analyze repositories sequentially.
@@ -711,13 +1507,27 @@ class LocalRepoAnalyzer:
                 continue
         return results
 
-    def _analyze_parallel(self, urls: list[str], max_workers: int) -> list[RepositoryAnalysis]:
-        # Analyze repositories in parallel using thread pool.
+    def _analyze_parallel(
+        self, urls: list[str], max_workers: int, executor: str = "thread"
+    ) -> list[RepositoryAnalysis]:
+        # Analyze repositories in parallel on a thread or process pool.
         results = []
-        colored_print(f"\n Analyzing {len(urls)} repositories with {max_workers} workers", "cyan")
+        colored_print(
+            f"\n Analyzing {len(urls)} repositories with {max_workers} {executor} workers", "cyan"
+        )
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_url = {executor.submit(self.analyze_repository, url): url for url in urls}
+        if executor == "process":
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_repository_worker,
+                initargs=(self, catalogue_hash(), GSF_PATTERNS, GREEN_KEYWORDS),
+            )
+            task = _analyze_in_worker
+        else:
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+            task = self.analyze_repository
+        with pool:
+            future_to_url = {pool.submit(task, url): url for url in urls}
             for future in as_completed(future_to_url):
                 url = future_to_url[future]
                 try:
@@ -732,4 +1542,6 @@ class LocalRepoAnalyzer:
                 except Exception as e:
                     colored_print(f"   Error analyzing {url}: {e}", "red")
 
+        if executor == "process" and self.mirror_cache:
+            self.mirror_cache.evict()
         return results
@@ -0,0 +1,270 @@
+# Single-pass process metrics engine over one `git log -p` stream.
+
+from __future__ import annotations
+
+import io
+import os
+import re
+import statistics
+import subprocess
+import tempfile
+from collections.abc import Iterable
+from datetime import datetime
+from math import log
+from typing import Any
+
+from greenmining.analyzers.streaming_diff_analyzer import (
+    COMMIT_MARKER,
+    _strip_prefix,
+    _unquote_path,
+)
+
+# Quoted path token in a "diff --git" line ("a/x y" when the path needs quoting)
+QUOTED_PATH_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+
+
+def _diff_git_paths(rest: str) -> tuple[str, str]:
+    # ("dir/x", "dir/x") from 'a/dir/x b/dir/x' or '"a/dir x" "b/dir x"'.
+    quoted = QUOTED_PATH_RE.findall(rest)
+    if len(quoted) == 2:
+        return _strip_prefix(quoted[0]) or "", _strip_prefix(quoted[1]) or ""
+    # Without a rename both halves name the same path, so split in the middle
+    half = (len(rest) - 5) // 2
+    path = rest[2 : 2 + half]
+    return path, path
+
+
+class ProcessMetricsEngine:
+    # Compute PyDriller's eight process metrics (ChangeSet, CodeChurn, CommitsCount,
+    # ContributorsCount, ContributorsExperience, HistoryComplexity, HunksCount,
+    # LinesCount) from a single history walk into per-file accumulators.
+    # Results match the PyDriller classes: the walk is newest first, renamed files
+    # are tracked under their newest path, deleted files accumulate under None, and
+    # a hunk is a run of consecutive +/- lines ended by a context line or hunk header.
+    # The patch keeps git's default context: with -U0 git aligns some changes
+    # differently, and the line counts no longer match numstat or PyDriller.
+
+    def __init__(self):
+        self.files_per_commit: list[int] = []
+        self.commits: dict[str | None, int] = {}
+        self.churns: dict[str | None, list[int]] = {}
+        self.contributions: dict[str | None, dict[str, int]] = {}
+        self.modifications: dict[str | None, int] = {}
+        self.hunks: dict[str | None, list[int]] = {}
+        self.lines_added: dict[str | None, list[int]] = {}
+        self.lines_removed: dict[str | None, list[int]] = {}
+        self._renamed: dict[str | None, str | None] = {}
+
+    def add_file(
+        self,
+        author_email: str,
+        new_path: str | None,
+        old_path: str | None,
+        renamed: bool,
+        added: int,
+        deleted: int,
+        hunks: int,
+    ):
+        # Fold one modified file into every metric (same order as PyDriller's walk).
+        filepath = self._renamed.get(new_path, new_path)
+        if renamed:
+            self._renamed[old_path] = filepath
+        self.commits[filepath] = self.commits.get(filepath, 0) + 1
+        self.churns.setdefault(filepath, []).append(added - deleted)
+        author = author_email.strip()
+        authored = self.contributions.setdefault(filepath, {})
+        authored[author] = authored.get(author, 0) + added + deleted
+        if added + deleted:
+            self.modifications[filepath] = self.modifications.get(filepath, 0) + added + deleted
+        self.hunks.setdefault(filepath, []).append(hunks)
+        self.lines_added.setdefault(filepath, []).append(added)
+        self.lines_removed.setdefault(filepath, []).append(deleted)
+
+    def add_commit(self, files_changed: int):
+        self.files_per_commit.append(files_changed)
+
+    def _history_complexity(self) -> dict[str | None, float]:
+        files = dict(self.modifications)
+        total = sum(files.values())
+        n_files = len(files)
+        for filepath in files:
+            files[filepath] /= total
+        entropy = 0
+        if len(files) > 1:
+            entropy = -sum(p * log(p + 1 / 1e10, n_files) for p in files.values())
+        for filepath in files:
+            files[filepath] = round(files[filepath] * entropy * 100, 2)
+        return files
+
+    def metrics(self) -> dict[str, Any]:
+        # Metrics dict with the keys LocalRepoAnalyzer reports.
+        contributors = {}
+        experience = {}
+        for path, authored in self.contributions.items():
+            total = sum(authored.values())
+            if total:
+                contributors[path] = len(authored)
+                experience[path] = round(100 * max(authored.values()) / total, 2)
+
+        lines_count = {}
+        for path, lines in self.lines_added.items():
+            lines_count[path] = lines_count.get(path, 0) + sum(lines)
+        for path, lines in self.lines_removed.items():
+            lines_count[path] = lines_count.get(path, 0) + sum(lines)
+
+        return {
+            "change_set_max": max(self.files_per_commit, default=0),
+            "change_set_avg": (
+                round(statistics.mean(self.files_per_commit)) if self.files_per_commit else 0
+            ),
+            "code_churn": {path: sum(churns) for path, churns in self.churns.items()},
+            "commits_per_file": dict(self.commits),
+            "contributors_per_file": contributors,
+            "contributors_experience": experience,
+            "history_complexity": self._history_complexity(),
+            "hunks_count": {path: statistics.median(h) for path, h in self.hunks.items()},
+            "lines_count": lines_count,
+        }
+
+    def compute(
+        self,
+        repo_path: str,
+        since: datetime | None = None,
+        to: datetime | None = None,
+        commits: Iterable[str] | None = None,
+        extra_args: Iterable[str] = (),
+    ) -> dict[str, Any]:
+        # Walk the history once and return the metrics dict.
+        # Args:
+        #   repo_path: Local repository path
+        #   since / to: Optional commit date bounds (PyDriller since/to)
+        #   commits: Restrict the walk to exactly these commit hashes, newest first
+        #            (git log order; rename tracking depends on it)
+        #   extra_args: Additional git log arguments (revision range, --max-count, ...)
+        if commits is not None:
+            commits = list(commits)
+            if not commits:
+                return self.metrics()
+        command = [
+            "git",
+            "-C",
+            str(repo_path),
+            "-c",
+            "core.quotePath=false",
+            "log",
+            "-p",
+            "-M",
+            "--no-color",
+            "--no-ext-diff",
+            "--src-prefix=a/",
+            "--dst-prefix=b/",
+            f"--format={COMMIT_MARKER}%ae",
+        ]
+        if since:
+            command.append(f"--since={since.isoformat()}")
+        if to:
+            command.append(f"--until={to.isoformat()}")
+        command.extend(extra_args)
+
+        with tempfile.TemporaryFile() as stderr, tempfile.TemporaryFile() as stdin:
+            if commits is not None:
+                # Only the listed commits, in the given order; hashes go through
+                # stdin so thousands of them never hit the argument length limit
+                command.extend(["--no-walk=unsorted", "--stdin"])
+                stdin.write("".join(f"{commit}\n" for commit in commits).encode())
+                stdin.seek(0)
+            process = subprocess.Popen(
+                command,
+                stdin=stdin,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                env={**os.environ, "GIT_PAGER": "cat"},
+            )
+            # Split on "\n" only, like PyDriller's line counts
+            stdout = io.TextIOWrapper(
+                process.stdout, encoding="utf-8", errors="replace", newline="\n"
+            )
+            try:
+                self.compute_stream(stdout)
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                stdout.close()
+                returncode = process.wait()
+                if returncode > 0:
+                    stderr.seek(0)
+                    message = stderr.read().decode("utf-8", "replace").strip()
+                    raise RuntimeError(f"git log failed for {repo_path}: {message}")
+        return self.metrics()
+
+    def compute_stream(self, lines: Iterable[str]):
+        # Accumulate `git log -p --format=\x1e%ae` output.
+        author = None
+        files = 0
+        current = None  # [new_path, old_path, renamed, added, deleted, hunks]
+        in_header = False
+        in_run = False
+
+        def end_file():
+            if current is not None:
+                self.add_file(author, *current)
+
+        for line in lines:
+            if line.startswith(COMMIT_MARKER):
+                end_file()
+                if author is not None:
+                    self.add_commit(files)
+                author = line[1:].rstrip("\n")
+                files = 0
+                current = None
+                continue
+            if author is None:
+                continue
+
+            if line.startswith("diff --git "):
+                end_file()
+                files += 1
+                old_path, new_path = _diff_git_paths(line[11:].rstrip("\n"))
+                current = [new_path, old_path, False, 0, 0, 0]
+                in_header = True
+                in_run = False
+                continue
+            if current is None:
+                continue
+
+            if in_header:
+                if line.startswith("@@"):
+                    in_header = False
+                elif line.startswith("new file mode"):
+                    current[1] = None
+                elif line.startswith("deleted file mode"):
+                    current[0] = None
+                elif line.startswith("rename from "):
+                    current[1] = _unquote_path(line[12:].rstrip("\n"))
+                    current[2] = True
+                elif line.startswith("rename to "):
+                    current[0] = _unquote_path(line[10:].rstrip("\n"))
+                    current[2] = True
+                elif line.startswith("--- "):
+                    current[1] = _strip_prefix(line[4:])
+                elif line.startswith("+++ "):
+                    current[0] = _strip_prefix(line[4:])
+                continue
+
+            # Hunk headers and "\ No newline" markers end a run of changes; a
+            # bare "\r" inside a line does too (PyDriller uses str.splitlines)
+            for part in line.splitlines() or [""]:
+                if part.startswith(("+", "-")):
+                    if not in_run:
+                        in_run = True
+                        current[5] += 1
+                else:
+                    in_run = False
+            if line.startswith("+"):
+                current[3] += 1
+            elif line.startswith("-"):
+                current[4] += 1
+
+        end_file()
+        if author is not None:
+            self.add_commit(files)
@@ -224,7 +224,13 @@ Commits were analyzed using a keyword and heuristic-based classification framewo
         # Pattern descriptions
         pattern_details = []
         for i, pattern in enumerate(patterns[:10], 1):
-            pattern_details.append(f"""**{i}. {pattern["pattern_name"]}**
+            conf = pattern["confidence_breakdown"]
+            detail_lines = ""
+            if pattern.get("category"):
+                detail_lines += f"\n- Category: {pattern['category']}"
+            if pattern.get("sci_impact"):
+                detail_lines += f"\n- SCI Impact: {pattern['sci_impact']}"
+            pattern_details.append(f"""**{i}. {pattern["pattern_name"]}**{detail_lines}
 - Frequency: {format_number(pattern["count"])} commits ({format_percentage(pattern["percentage"])})
 - Confidence Distribution: HIGH={conf["HIGH"]}, MEDIUM={conf["MEDIUM"]}, LOW={conf["LOW"]}
 - Example Commits: {", ".join([c[:8] for c in pattern["example_commits"][:3]])}""")